@@ -1,13 +1,12 @@
 import os
 from enum import Enum
-from typing import cast, Optional, List
+from functools import lru_cache
+from typing import cast, Literal, Optional, List
 
 import yaml
 from pydantic import BaseModel, ValidationError
 
-from zootopia.controller.memory.autodb.models import AutoDBConfig
 from config.models import ConstantIDConfig, SupabaseConfig, _UserIDConfig
-from zootopia.apis.gsuite.models import GAuthConfig
 
 class CalendarConfig(BaseModel):
     CALENDAR_NAME: str
@@ -30,6 +29,8 @@ class WebAccessConfig(BaseModel):
 
 class TelegramConfig(BaseModel):
     TELEGRAM_BOT_TOKEN: str
+    # Min seconds between edits of a streamed reply, within Telegram's rate limits
+    STREAM_EDIT_INTERVAL_SECONDS: float = 1.0
 
 class BirdConfig(BaseModel):
     BIRD_API_URL: str
@@ -38,6 +39,7 @@ class BirdConfig(BaseModel):
     BIRD_API_KEY: str
     BIRD_SIGNING_KEY: str
     BIRD_CHANNEL_ID: str
+    BIRD_TIMEOUT_SECONDS: float = 10
 
 class MessagingConfig(BaseModel):
     TELEGRAM: TelegramConfig
@@ -46,18 +48,80 @@ class MessagingConfig(BaseModel):
 class SupabaseConfig(BaseModel):
     URL: str
     KEY: str
+    # Connection pool of the async client, shared by every request of a worker
+    HTTP2: bool = True
+    MAX_CONNECTIONS: int = 100
+    MAX_KEEPALIVE_CONNECTIONS: int = 20
+    KEEPALIVE_EXPIRY_SECONDS: float = 30
+    CONNECT_TIMEOUT_SECONDS: float = 5
+    TIMEOUT_SECONDS: float = 10
+
+class SQLiteConfig(BaseModel):
+    PATH: str = "zootopia.db"
+
+class IdentityCacheConfig(BaseModel):
+    ENABLED: bool = True
+    MAX_SIZE: int = 10000
+    TTL_SECONDS: int = 300
+    USE_REDIS: bool = False
+
+class MessageWriterConfig(BaseModel):
+    MAX_BATCH: int = 200
+    FLUSH_INTERVAL_SECONDS: float = 0.5
+    MAX_PENDING: int = 10000
+
+class RecentMessagesConfig(BaseModel):
+    # Redis ring buffer serving ShortTermHistory; uses ASYNC_CONFIG.REDIS_URL
+    ENABLED: bool = False
+    MAX_SIZE: int = 50
+    TTL_SECONDS: int = 86400
+
+class InstrumentationConfig(BaseModel):
+    ENABLED: bool = True
+    SLOW_QUERY_MS: float = 250
 
 class DatabaseConfig(BaseModel):
+    BACKEND: Literal["supabase", "sqlite"] = "supabase"
     SUPABASE: SupabaseConfig
+    SQLITE: SQLiteConfig = SQLiteConfig()
+    IDENTITY_CACHE: IdentityCacheConfig = IdentityCacheConfig()
+    MESSAGE_WRITER: MessageWriterConfig = MessageWriterConfig()
+    RECENT_MESSAGES: RecentMessagesConfig = RecentMessagesConfig()
+    INSTRUMENTATION: InstrumentationConfig = InstrumentationConfig()
+
+class LLMCacheConfig(BaseModel):
+    # Responses of call sites that opt in (cache=True); Redis uses ASYNC_CONFIG.REDIS_URL
+    ENABLED: bool = True
+    MAX_SIZE: int = 1000
+    TTL_SECONDS: int = 3600
+    USE_REDIS: bool = False
+
+class LLMRouterConfig(BaseModel):
+    # Ordered LLMConfig providers (e.g. ["GROQ", "OPENAI"]), each with a MODEL entry.
+    # Set to route intent detection through them, with hedging and failover.
+    PROVIDERS: List[str] = []
+    HEDGE_PERCENTILE: float = 95
+    MIN_SAMPLES: int = 50
+    DEFAULT_HEDGE_DELAY_SECONDS: float = 2.0
 
 class LLMConfig(BaseModel):
     GEMINI: dict[str, str]
     GROQ: dict[str, str]
     OPENAI: dict[str, str]
     ANTHROPIC: dict[str, str]
+    # Concurrent requests per provider (e.g. {"GROQ": 4}), sized to its rate limits
+    MAX_CONCURRENCY: dict[str, int] = {}
+    DEFAULT_MAX_CONCURRENCY: int = 16
+    MAX_CONNECTIONS: int = 100
+    TIMEOUT_SECONDS: float = 60
+    CACHE: LLMCacheConfig = LLMCacheConfig()
+    ROUTER: LLMRouterConfig = LLMRouterConfig()
 
 class IntentDetectionConfig(BaseModel):
     MODEL: str
+    # Prompt history: the most recent messages that fit in the token budget
+    HISTORY_TOKEN_BUDGET: int = 2000
+    MAX_HISTORY_MESSAGES: int = 50
 
 class HumanLikeMemoryConfig(BaseModel):
     MODEL: str
@@ -73,12 +137,51 @@ class BehaviorsConfig(BaseModel):
     INTERNET_ACCESS: Optional[dict]
     ASYNC_CONFIG: AsyncConfig
 
+class IngestConfig(BaseModel):
+    NUM_WORKERS: int = 8
+    QUEUE_SIZE: int = 1000
+
+class DedupConfig(BaseModel):
+    MAX_SIZE: int = 10000
+    TTL_SECONDS: int = 3600
+    USE_REDIS: bool = False
+
+class AccessLogConfig(BaseModel):
+    SAMPLE_RATE: float = 0.1
+    MAX_BODY_BYTES: int = 1024
+
+class AdmissionConfig(BaseModel):
+    MAX_QUEUE_DEPTH: Optional[int] = None  # defaults to INGEST.QUEUE_SIZE
+    MAX_IN_FLIGHT: int = 500
+    MAX_IN_FLIGHT_PER_PROVIDER: dict[str, int] = {}  # e.g. {"telegram": 300}
+    RETRY_AFTER_SECONDS: int = 5
+
+class PollingConfig(BaseModel):
+    BATCH_SIZE: int = 100  # Telegram caps getUpdates at 100
+    TIMEOUT_SECONDS: int = 30
+    OFFSET_FILE: str = "telegram_offset"
+    USE_REDIS: bool = False
+
+class ServerConfig(BaseModel):
+    HOST: str = "127.0.0.1"
+    PORT: int = 8000
+    # Per-room ordering (RoomExecutor) and the message write buffer live in one
+    # process, so more workers can reorder a room's messages and hide its unwritten rows
+    WORKERS: int = 1
+    DRAIN_TIMEOUT_SECONDS: float = 30
+    INGEST: IngestConfig = IngestConfig()
+    DEDUP: DedupConfig = DedupConfig()
+    ACCESS_LOG: AccessLogConfig = AccessLogConfig()
+    ADMISSION: AdmissionConfig = AdmissionConfig()
+    POLLING: PollingConfig = PollingConfig()
+
 class ZootopiaConfig(BaseModel):
     MESSAGING_CONFIG: MessagingConfig
     DATABASE_CONFIG: DatabaseConfig
     LLM_CONFIG: LLMConfig
     BEHAVIORS_CONFIG: BehaviorsConfig
     WEB_ACCESS_CONFIG: WebAccessConfig
+    SERVER_CONFIG: ServerConfig = ServerConfig()
 
 
 def set_environment_variables(config_data, prefix=""):
@@ -112,10 +215,32 @@ def load_config(
 
 testing = True
 prefix = "zootopia/config/" if testing else "/etc/secrets/"
-config = cast(ZootopiaConfig, load_config(f"{prefix}local.yaml", set_env=True))
-autodb_config = cast(
-    AutoDBConfig, load_config("zootopia/config/autodb.yaml", config_type=AutoDBConfig)
-)
+CONFIG_PATH = os.environ.get("ZOOTOPIA_CONFIG", f"{prefix}local.yaml")
+AUTODB_CONFIG_PATH = os.environ.get("ZOOTOPIA_AUTODB_CONFIG", "config/autodb.yaml")
+
+
+@lru_cache(maxsize=None)
+def get_config() -> ZootopiaConfig:
+    """Loads the application config on first use, not at import time."""
+    return cast(ZootopiaConfig, load_config(CONFIG_PATH, set_env=True))
+
+
+@lru_cache(maxsize=None)
+def get_autodb_config():
+    """Loads the AutoDB config on first use."""
+    from zootopia.controller.memory.autodb.models import AutoDBConfig
+
+    return cast(AutoDBConfig, load_config(AUTODB_CONFIG_PATH, config_type=AutoDBConfig))
+
+
+def __getattr__(name: str):
+    """Keeps `from config.config import config, autodb_config` working, lazily."""
+    if name == "config":
+        return get_config()
+    if name == "autodb_config":
+        return get_autodb_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 UserIDType = Enum(
     "UserIDType", [(field, field) for field in _UserIDConfig.model_fields]
@@ -1,62 +1,131 @@
 """Starts FastAPI server to receive messages"""
+import argparse
 import asyncio
-import os
-from contextlib import asynccontextmanager
-from pyngrok import ngrok
-import uvicorn
+import signal
+from functools import lru_cache
 from typing import Optional
 
-from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-
-from config.config import config
-from zootopia.platform.telegram.telegram import Telegram
-from zootopia.platform.sms.bird import BirdSMSProvider
-from zootopia.core.routers.message import router as message_router
+from config.config import get_config
 from zootopia.core.logger import logger
+from zootopia.server.app import create_app
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        print(f"Request: {request.method} {request.url}")
-        print(f"From: {request.client.host}")
-        print(f"Headers: {request.headers}")
-        body = await request.body()
-        print(f"Body: {body.decode()}")
-        response = await call_next(request)
-        return response
-
-async def configure_webhooks():
-    ngrok_connection = ngrok.connect(addr="127.0.0.1:8000", proto="http")
-    print(f"Ngrok public URL: {ngrok_connection.public_url}")
+async def register_webhooks(public_url: str):
+    """Points the Telegram and Bird webhooks at `{public_url}/message`."""
+    from zootopia.platform.sms.bird import BirdSMSProvider
+    from zootopia.platform.telegram.telegram import Telegram
 
+    config = get_config()
     _telegram = Telegram.from_config(config.MESSAGING_CONFIG.TELEGRAM)
     _bird = BirdSMSProvider.from_config(config.MESSAGING_CONFIG.BIRD)
-    webhook = f"{ngrok_connection.public_url}/message"
+    webhook = f"{public_url}/message"
     await asyncio.gather(
-        _telegram.register_webhook(webhook), 
+        _telegram.register_webhook(webhook),
         _bird.register_webhook(event="sms.inbound", webhook_url=webhook),
     )
 
-    print("\033[92m\033[1mNgrok and webhooks successfully set up!\033[0m")
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    logger.info("Starting application.")
-    yield 
+    print(f"\033[92m\033[1mWebhooks registered at {webhook}\033[0m")
 
-    # Shutdown
-    logger.info("Closing application.")
-    ngrok.kill()
 
 # Loading FastAPI app
-app = FastAPI(lifespan=lifespan)
-app.add_middleware(LoggingMiddleware)
-app.include_router(message_router)
+# Production: `python run.py serve`, or with gunicorn:
+# `gunicorn run:app -k uvicorn.workers.UvicornWorker -w 1 --graceful-timeout 30`
+@lru_cache(maxsize=None)
+def get_app():
+    """Builds the FastAPI app on first use, not when `run` is imported."""
+    return create_app(get_config())
+
+
+def __getattr__(name: str):
+    """Serves `run:app` to uvicorn and gunicorn, built lazily."""
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def dev():
+    """Single reloading process, exposed through an ngrok tunnel."""
+    import uvicorn
+    from pyngrok import ngrok
+
+    config = get_config()
+    host, port = config.SERVER_CONFIG.HOST, config.SERVER_CONFIG.PORT
+    ngrok_connection = ngrok.connect(addr=f"{host}:{port}", proto="http")
+    print(f"Ngrok public URL: {ngrok_connection.public_url}")
+    try:
+        asyncio.run(register_webhooks(ngrok_connection.public_url))
+        uvicorn.run("run:app", host=host, port=port, reload=True)
+    finally:
+        ngrok.kill()
+
+
+def serve(host: Optional[str], port: Optional[int], workers: Optional[int]):
+    """Production server. Webhooks are registered separately (`run.py webhooks`)."""
+    import uvicorn
+
+    server_config = get_config().SERVER_CONFIG
+    host = host or server_config.HOST
+    port = port or server_config.PORT
+    workers = workers or server_config.WORKERS
+    if workers > 1:
+        logger.warning(
+            f"Serving with {workers} workers: a room's messages can be handled out of "
+            "order and history misses rows still buffered by another worker"
+        )
+
+    uvicorn.run(
+        "run:app",
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=int(server_config.DRAIN_TIMEOUT_SECONDS),
+    )
+
+
+async def poll():
+    """Long-polls Telegram instead of receiving webhooks (no public URL needed)."""
+    from zootopia.server.polling import TelegramPoller
+
+    # Same startup/shutdown as the server: ingest workers start, then drain on exit
+    app = get_app()
+    async with app.router.lifespan_context(app):
+        poller = TelegramPoller.from_config(get_config(), app.state.ingest_queue)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, poller.stop)
+        await poller.run()
+
 
 if __name__ == "__main__":
-    asyncio.run(configure_webhooks())
-    uvicorn.run("run:app", host="127.0.0.1", port=8000, reload=True)
-  
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("dev", help="reloading server behind ngrok (default)")
+
+    serve_parser = commands.add_parser("serve", help="production server")
+    # Defaults to SERVER_CONFIG, read only once the command needs it
+    serve_parser.add_argument("--host")
+    serve_parser.add_argument("--port", type=int)
+    serve_parser.add_argument("--workers", type=int)
+
+    webhooks_parser = commands.add_parser("webhooks", help="register webhooks")
+    webhooks_parser.add_argument("public_url", help="e.g. https://zoo.example.com")
+
+    commands.add_parser("poll", help="Telegram long-polling ingest, no webhook")
+
+    importtime_parser = commands.add_parser("importtime", help="cold-start import report")
+    importtime_parser.add_argument("module", nargs="?", default="run")
+    importtime_parser.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers)
+    elif args.command == "webhooks":
+        asyncio.run(register_webhooks(args.public_url.rstrip("/")))
+    elif args.command == "poll":
+        asyncio.run(poll())
+    elif args.command == "importtime":
+        from zootopia.bench.importtime import measure_imports, print_report
+
+        print_report(args.module, measure_imports(args.module), args.top)
+    else:
+        dev()
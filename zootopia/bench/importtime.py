@@ -0,0 +1,72 @@
+"""
+Cold-start report: how long importing a module takes, and which imports dominate.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+ranks the imported modules by cumulative (self + children) time.
+
+Steps:
+- run `python run.py importtime` (defaults to the server entrypoint, `run`)
+- or `python -m zootopia.bench.importtime zootopia.server.app --top 30`
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str) -> List[ImportTiming]:
+    """Imports `module` in a fresh interpreter and returns one timing per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            )
+        )
+    return timings
+
+
+def print_report(module: str, timings: List[ImportTiming], top: int = 20) -> None:
+    """Prints the total import time and the `top` slowest modules."""
+    total_us = sum(timing.cumulative_us for timing in timings if timing.depth == 0)
+    print(f"import {module}: {total_us / 1000:.1f} ms, {len(timings)} modules")
+    print(f"{'module':<60}{'self ms':>10}{'cumul. ms':>12}")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(
+            f"{timing.module:<60}{timing.self_us / 1000:>10.1f}{timing.cumulative_us / 1000:>12.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="run")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    print_report(args.module, measure_imports(args.module), args.top)
+
+
+if __name__ == "__main__":
+    main()
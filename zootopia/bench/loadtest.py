@@ -0,0 +1,171 @@
+"""
+Load test: replays recorded webhook bodies against the /message route.
+
+The real FastAPI app runs in-process with the in-memory (or a SQLite) database,
+the fake LLM and fake messaging providers, so results only measure our own
+pipeline. Reports throughput and p50/p95/p99 latency per pipeline stage.
+
+Steps:
+- drop recorded Telegram / Bird webhook bodies (*.json) in zootopia/bench/payloads
+- run `python -m zootopia.bench.loadtest --rate 200 --count 2000`
+- add `--sqlite /tmp/bench.db` to include real (local) database I/O
+"""
+
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import logging
+import os
+import time
+from typing import List, cast
+
+import httpx
+from fastapi import FastAPI
+
+from config.config import ZootopiaConfig, load_config
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.llm.fake import FakeLLM
+from zootopia.platform.fake import FakeMessageProvider
+from zootopia.platform.models import MessageProvider
+from zootopia.platform.registry import ProviderRegistry
+from zootopia.platform.sms.bird import BirdSMSProvider
+from zootopia.platform.telegram.telegram import Telegram
+from zootopia.server.app import create_app
+from zootopia.server.container import ServiceContainer
+from zootopia.storage.database.memory import InMemoryDB
+from zootopia.storage.database.sqlite import SQLiteDB
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# In pipeline order. http.ack is measured by the client, the rest by the server
+STAGES = [
+    "http.ack",
+    "pipeline.queue_wait",
+    "pipeline.context",
+    "pipeline.history",
+    "pipeline.intent",
+    "pipeline.actions",
+    "pipeline.first_chunk",
+    "pipeline.controller",
+    "pipeline.total",
+]
+
+
+def load_corpus(corpus_dir: str) -> List[dict]:
+    """Loads every recorded webhook body of the corpus directory."""
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.json"))):
+        with open(path, "r", encoding="utf-8") as payload_file:
+            bodies.append(json.load(payload_file))
+
+    if not bodies:
+        raise ValueError(f"No webhook payloads found in {corpus_dir}")
+    return bodies
+
+
+def personalize(body: dict, index: int, rooms: int) -> dict:
+    """Gives a recorded body a unique delivery id and one of `rooms` senders."""
+    body = copy.deepcopy(body)
+    sender = index % rooms
+    if "update_id" in body:
+        body["update_id"] = index
+        message = body["message"]
+        message["message_id"] = index
+        message["from"]["id"] = message["chat"]["id"] = 100000 + sender
+    elif "payload" in body:
+        payload = body["payload"]
+        payload["id"] = f"loadtest-{index}"
+        payload["sender"]["contact"]["identifierValue"] = f"+1555{sender:07d}"
+    return body
+
+
+async def replay(app: FastAPI, corpus: List[dict], rate: float, count: int, rooms: int):
+    """Posts `count` webhooks at `rate` per second (open loop), then drains the app."""
+    start = time.perf_counter()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+
+            async def send(body: dict):
+                with metrics.timer("http.ack"):
+                    response = await client.post("/message", json=body)
+                metrics.incr("http.responses", status=response.status_code)
+
+            tasks = []
+            for index in range(count):
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                body = personalize(corpus[index % len(corpus)], index, rooms)
+                tasks.append(asyncio.create_task(send(body)))
+            await asyncio.gather(*tasks)
+
+        sent_seconds = time.perf_counter() - start
+    # Leaving the lifespan drains the ingest queue
+    total_seconds = time.perf_counter() - start
+
+    return sent_seconds, total_seconds
+
+
+def report(count: int, sent_seconds: float, total_seconds: float):
+    """Prints throughput and per-stage latency percentiles."""
+    snapshot = metrics.snapshot()
+    processed = metrics.summary("pipeline.total").get("count", 0)
+
+    print(f"Sent       {count} webhooks in {sent_seconds:.2f}s ({count / sent_seconds:.1f} req/s)")
+    print(f"Processed  {processed} messages in {total_seconds:.2f}s ({processed / total_seconds:.1f} msg/s)")
+    for key, value in sorted(snapshot["counters"].items()):
+        print(f"{key:<30} {value:>10.0f}")
+
+    print(f"\n{'stage':<24}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    for stage in STAGES:
+        summary = metrics.summary(stage)
+        if not summary["count"]:
+            continue
+        print(
+            f"{stage:<24}{summary['count']:>8}{summary['p50_ms']:>12.2f}"
+            f"{summary['p95_ms']:>12.2f}{summary['p99_ms']:>12.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "payloads"))
+    parser.add_argument("--config", default=os.path.join(BENCH_DIR, "config.yaml"))
+    parser.add_argument("--rate", type=float, default=100, help="webhooks per second")
+    parser.add_argument("--count", type=int, default=1000, help="webhooks to send")
+    parser.add_argument("--rooms", type=int, default=100, help="distinct senders")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM seconds")
+    parser.add_argument("--sqlite", help="SQLite file to use instead of the in-memory DB")
+    parser.add_argument("--verbose", action="store_true", help="keep INFO logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    config = cast(ZootopiaConfig, load_config(args.config))
+    services = ServiceContainer.from_config(
+        config,
+        database=SQLiteDB(args.sqlite) if args.sqlite else InMemoryDB(),
+        llm=FakeLLM(latency=args.llm_latency),
+        # Replies are generated and streamed, but not sent anywhere
+        providers=ProviderRegistry({
+            MessageProvider.BIRD: lambda: FakeMessageProvider(BirdSMSProvider),
+            MessageProvider.TELEGRAM: lambda: FakeMessageProvider(Telegram),
+        }),
+    )
+    app = create_app(config, services=services)
+    corpus = load_corpus(args.corpus)
+
+    sent_seconds, total_seconds = asyncio.run(
+        replay(app, corpus, args.rate, args.count, args.rooms)
+    )
+    report(args.count, sent_seconds, total_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: webhook body -> ZootopiaMessage, previous path vs current path.
+
+previous: json.loads + '"from"' string replace + plain union validation,
+          plus a new provider client per request
+current:  orjson.loads + tagged union validation, shared provider from the registry
+
+Steps:
+- run `python -m zootopia.bench.parse_bench --iterations 5000`
+"""
+
+import argparse
+import json
+import os
+import timeit
+from typing import Union, cast
+
+import orjson
+from pydantic import BaseModel
+
+from config.config import ZootopiaConfig, load_config
+from zootopia.platform.models import (
+    TelegramMessage,
+    _TelegramMessageDocument,
+    _TelegramMessageLocation,
+    _TelegramMessagePhoto,
+    _TelegramMessageSticker,
+    _TelegramMessageText,
+)
+from zootopia.platform.registry import ProviderRegistry
+from zootopia.platform.telegram.telegram import Telegram
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _PlainUnionTelegramMessage(BaseModel):
+    """TelegramMessage before the tagged union: pydantic tries each member in turn."""
+
+    update_id: int
+    message: Union[
+        _TelegramMessageText,
+        _TelegramMessagePhoto,
+        _TelegramMessageSticker,
+        _TelegramMessageLocation,
+        _TelegramMessageDocument,
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=os.path.join(BENCH_DIR, "config.yaml"))
+    parser.add_argument(
+        "--payload", default=os.path.join(BENCH_DIR, "payloads", "telegram_text.json")
+    )
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    config = cast(ZootopiaConfig, load_config(args.config))
+    with open(args.payload, "rb") as payload_file:
+        raw = payload_file.read()
+
+    registry = ProviderRegistry.from_config(config.MESSAGING_CONFIG)
+
+    def previous_parse():
+        return _PlainUnionTelegramMessage(
+            **json.loads(raw.decode().replace('"from"', '"from_"'))
+        )
+
+    def previous_full():
+        Telegram.from_config(config.MESSAGING_CONFIG.TELEGRAM)
+        return previous_parse()
+
+    def current_parse():
+        return TelegramMessage.model_validate(orjson.loads(raw))
+
+    def current_full():
+        body = orjson.loads(raw)
+        return registry.for_request(body).receive_message(body)
+
+    cases = [
+        ("previous parse", previous_parse),
+        ("current parse", current_parse),
+        ("previous parse + client", previous_full),
+        ("current parse + client", current_full),
+    ]
+    print(f"{'case':<28}{'us/op':>12}{'ops/s':>12}")
+    for name, case in cases:
+        case()  # warm up (builds the shared client once)
+        seconds = timeit.timeit(case, number=args.iterations) / args.iterations
+        print(f"{name:<28}{seconds * 1e6:>12.1f}{1 / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
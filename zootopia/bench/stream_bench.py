@@ -0,0 +1,117 @@
+"""
+Streamed replies: one Telegram message through the whole controller, with a fake
+bot and a fake LLM that writes its reply word by word.
+
+Reports when the first words reached the chat and when the full reply did, and
+checks that the reply was sent once, edited at most once per
+STREAM_EDIT_INTERVAL_SECONDS, ended on the full text and was saved once.
+
+Steps:
+- run `python -m zootopia.bench.stream_bench --llm-latency 3 --edit-interval 0.5`
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from types import SimpleNamespace
+from typing import List, Tuple, cast
+
+import orjson
+
+from config.config import ZootopiaConfig, load_config
+from zootopia.controller import AgentController, ContextManager
+from zootopia.core.logger import logger
+from zootopia.core.schema import Tables
+from zootopia.llm.fake import FakeLLM
+from zootopia.platform.models import MessageProvider
+from zootopia.platform.registry import ProviderRegistry
+from zootopia.platform.telegram.telegram import Telegram
+from zootopia.storage.database.database import ThreadedDatabase
+from zootopia.storage.database.memory import InMemoryDB
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REPLY = (
+    '{"action": "message", "args": {"content": "Yesterday we planned your meals for the '
+    'week, and you asked for a reminder to drink more water in the afternoon."}}'
+)
+
+
+class _FakeBot:
+    """Records the Bot API calls Telegram.send_stream makes, with their times."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[float, str, str]] = []
+
+    async def send_message(self, chat_id, text):
+        self.calls.append((time.perf_counter(), "send_message", text))
+        return SimpleNamespace(message_id=len(self.calls))
+
+    async def edit_message_text(self, text, chat_id, message_id):
+        self.calls.append((time.perf_counter(), "edit_message_text", text))
+
+
+async def run(config: ZootopiaConfig, body: dict, llm_latency: float, edit_interval: float):
+    telegram = Telegram(
+        config.MESSAGING_CONFIG.TELEGRAM.TELEGRAM_BOT_TOKEN, stream_edit_interval=edit_interval
+    )
+    bot = telegram._bot = _FakeBot()
+    database = ThreadedDatabase(InMemoryDB())
+    context = await ContextManager.create(
+        body,
+        config,
+        database=database,
+        providers=ProviderRegistry({MessageProvider.TELEGRAM: lambda: telegram}),
+    )
+
+    start = time.perf_counter()
+    await AgentController(context, llm=FakeLLM(latency=llm_latency, response=REPLY)).handle_message()
+    replies = [
+        row
+        for row in await database.query(
+            Tables.MESSAGES.value, (Tables.MESSAGES__room_id.value, context.room.id)
+        )
+        if not row.from_user
+    ]
+    return start, bot.calls, replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=os.path.join(BENCH_DIR, "config.yaml"))
+    parser.add_argument(
+        "--payload", default=os.path.join(BENCH_DIR, "payloads", "telegram_text.json")
+    )
+    parser.add_argument("--llm-latency", type=float, default=3.0, help="fake LLM seconds")
+    parser.add_argument("--edit-interval", type=float, default=0.5)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    config = cast(ZootopiaConfig, load_config(args.config))
+    with open(args.payload, "rb") as payload_file:
+        body = orjson.loads(payload_file.read())
+
+    start, calls, replies = asyncio.run(
+        run(config, body, args.llm_latency, args.edit_interval)
+    )
+    for at, method, text in calls:
+        print(f"{(at - start) * 1000:>8.0f} ms  {method:<18}{len(text):>5} chars")
+
+    sends = [call for call in calls if call[1] == "send_message"]
+    edits = [call for call in calls if call[1] == "edit_message_text"]
+    # The last edit may follow the previous one at once: it must carry the final text
+    gaps = [b[0] - a[0] for a, b in zip(sends + edits[:-2], edits[:-1])]
+    print(f"first words after {(sends[0][0] - start) * 1000:.0f} ms, "
+          f"full reply after {(calls[-1][0] - start) * 1000:.0f} ms, {len(edits)} edits")
+
+    assert len(sends) == 1, f"expected one sent message, got {len(sends)}"
+    assert edits and edits[-1][2] == REPLY, "the last edit must carry the full reply"
+    assert all(gap >= args.edit_interval * 0.9 for gap in gaps), f"edits too close: {gaps}"
+    assert len(replies) == 1 and replies[0].message == REPLY, "the reply must be saved once"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
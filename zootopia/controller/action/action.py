@@ -1,11 +1,38 @@
+from typing import AsyncIterator, List
+
 from zootopia.controller.context.context import ContextManager
+from zootopia.core.schema import Action, ActionResult, ActionType, MessageTableModel
+from zootopia.llm.llm import LLM
 
 class ActionManager:
     def __init__(
-        self, context: ContextManager
+        self, context: ContextManager, llm: LLM
     ) -> None:
         self.context = context
+        self.llm = llm
+
+    # TODO: design and implement RECALL and WEB_SEARCH
+    def execute_actions(
+        self, actions: List[Action], message_history: List[MessageTableModel]
+    ) -> List[ActionResult]:
+        results = []
+        for action in actions:
+            if action.type == ActionType.MESSAGE:
+                results.append(
+                    ActionResult(action=action, success=True, result=self._reply(message_history))
+                )
+        return results
 
-    # TODO: design and implement pseudo-code
-    def execute_actions(self):
-        pass
\ No newline at end of file
+    def _reply(self, message_history: List[MessageTableModel]) -> AsyncIterator[str]:
+        """
+        The agent's reply to the conversation, as chunks streamed from the LLM.
+        Nothing is generated until the caller iterates, so the first chunk can be
+        sent while the rest is still being written.
+        """
+        messages = [
+            {"role": "user" if msg.from_user else "assistant", "content": msg.message}
+            for msg in message_history
+        ]
+        return self.llm.agenerate_stream(
+            messages, system_prompt=self.context.config.BEHAVIORS_CONFIG.PROMPT
+        )
@@ -1,25 +1,50 @@
+import time
+from typing import AsyncIterator, Optional
+
 from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
 from zootopia.controller.context import ContextManager
 from zootopia.controller.intent import IntentManager
 from zootopia.controller.action import ActionManager
 from zootopia.controller.memory import ShortTermHistory, GeneralMemory
-from zootopia.core.schema import ActionType
+from zootopia.core.schema import ActionType, MessageTableModel, Tables
+from zootopia.llm.llm import LLM
+from zootopia.platform.models import TelegramMetadata
+from zootopia.storage.database.recent import RecentMessages
+from zootopia.storage.database.writer import MessageWriter
 
 
 class AgentController:
     def __init__(
         self, 
-        context: ContextManager
+        context: ContextManager,
+        llm: Optional[LLM] = None,
+        message_writer: Optional[MessageWriter] = None,
+        recent_messages: Optional[RecentMessages] = None,
     ) -> None:
         self.context = context
-        self.intent = IntentManager(context)
-        self.action = ActionManager(context)
-        self.short_term_history = ShortTermHistory(context)
+        self.message_writer = message_writer
+        self.recent_messages = recent_messages
+        intent_config = context.config.BEHAVIORS_CONFIG.INTENT_DETECTION
+        self.history_size = intent_config.MAX_HISTORY_MESSAGES
+        self.intent = (
+            IntentManager(
+                context, llm, history_token_budget=intent_config.HISTORY_TOKEN_BUDGET
+            )
+            if llm is not None
+            else IntentManager.from_config(context, intent_config)
+        )
+        self.action = ActionManager(context, self.intent.llm)
+        self.short_term_history = ShortTermHistory(context, message_writer, recent_messages)
         self.general_memory = GeneralMemory(context)
 
-    def handle_message(self):
+    async def handle_message(self):
         try:
-            recent_messages = self.short_term_history.get_recent_messages(count=10)
+            await self._save_message(self.context.message.text, from_user=True)
+            with metrics.timer("pipeline.history"):
+                recent_messages = await self.short_term_history.get_recent_messages(
+                    count=self.history_size
+                )
             possible_actions = [
                 ActionType.MESSAGE,
                 ActionType.RECALL,
@@ -27,24 +52,76 @@ class AgentController:
             ]
 
             # Produce list of actions based on recent messages
-            actions = self.intent.produce_actions(recent_messages, possible_actions)
+            with metrics.timer("pipeline.intent"):
+                actions = await self.intent.aproduce_actions(recent_messages, possible_actions)
             
             # Execute the actions
-            results = self.action.execute_actions(actions)
+            with metrics.timer("pipeline.actions"):
+                results = self.action.execute_actions(actions, recent_messages)
             
             # Update general memory with the results
             self.general_memory.update_memory(results)
             
             # Store new memories if necessary
-            self.general_memory.store_memory(recent_messages[-1])
+            if recent_messages:
+                self.general_memory.store_memory(recent_messages[-1])
             
             # Handle any necessary responses or side effects
-            self._handle_results(results)
+            await self._handle_results(results)
             
         except Exception as e:
             logger.error(f"Error in handling message: {str(e)}")
 
-    def _handle_results(self, results):
+    def _recipient(self):
+        metadata = self.context.message.metadata
+        return (
+            metadata.chat_id
+            if isinstance(metadata, TelegramMetadata)
+            else metadata.phone_number
+        )
+
+    async def send_reply(self, text: str) -> None:
+        """Sends a reply to the sender, then saves it without waiting on the DB."""
+        await self.context.messaging_service.send_message(text, self._recipient())
+        await self._save_message(text, from_user=False)
+
+    async def send_reply_stream(self, chunks: AsyncIterator[str]) -> None:
+        """
+        Sends a reply as it is generated (e.g. LLM.agenerate_stream), so the sender
+        sees the first words without waiting for the whole completion; then saves it.
+        """
+        parts = []
+        start = time.perf_counter()
+
+        async def record():
+            async for chunk in chunks:
+                if not parts:
+                    metrics.observe("pipeline.first_chunk", time.perf_counter() - start)
+                parts.append(chunk)
+                yield chunk
+
+        await self.context.messaging_service.send_stream(record(), self._recipient())
+        text = "".join(parts)
+        if text.strip():
+            await self._save_message(text, from_user=False)
+
+    async def _save_message(self, text: str, from_user: bool) -> None:
+        row = MessageTableModel(
+            room_id=self.context.room.id, from_user=from_user, message=text
+        )
+        if self.message_writer is not None:
+            self.message_writer.write(row)
+        else:
+            await self.context.database.insert(Tables.MESSAGES.value, row)
+        if self.recent_messages is not None:
+            await self.recent_messages.push(row)
+
+    async def _handle_results(self, results):
         # Implement logic to handle the results of actions
         # This could involve sending messages, updating application state, etc.
-        pass
\ No newline at end of file
+        for result in results:
+            if result.success and result.action.type == ActionType.MESSAGE:
+                if hasattr(result.result, "__aiter__"):
+                    await self.send_reply_stream(result.result)
+                else:
+                    await self.send_reply(str(result.result))
\ No newline at end of file
@@ -1,26 +1,66 @@
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
+from config.config import IntentDetectionConfig
+from zootopia.core.metrics import metrics
 from zootopia.core.schema import MessageTableModel, Action, ActionType
 from zootopia.llm.llm import LLM 
+from zootopia.llm.tokens import count_tokens
 from zootopia.core.utils.utils import clean_and_parse_llm_json_output, render_jinja_template
 import json
 
 class IntentManager:
-    def __init__(self, context, intent_model: str):
+    def __init__(self, context, llm: LLM, history_token_budget: Optional[int] = None):
         self.context = context
-        self.llm = LLM(model=intent_model)
+        self.llm = llm
+        self.history_token_budget = history_token_budget
 
     @classmethod
-    def from_config(cls, context, config: IntentConfig) -> "IntentManager":
+    def from_config(cls, context, config: IntentDetectionConfig) -> "IntentManager":
         return cls(
             context=context,
-            intent_model=config.intent_model
+            llm=LLM(model=config.MODEL),
+            history_token_budget=config.HISTORY_TOKEN_BUDGET,
         )
 
     def produce_actions(self, message_history: List[MessageTableModel], possible_actions: List[str]) -> List[Action]:
-        history_str = "\n".join([
+        prompt = self._build_prompt(message_history, possible_actions)
+        # Same history and actions give the same prompt, e.g. a new user's "hi".
+        # Greedy decoding, so the cached response is the one any call would get
+        content = self.llm.generate_response(
+            [{"role": "user", "content": prompt}], cache=True, temperature=0
+        )
+        return self._parse_actions(content, possible_actions)
+
+    async def aproduce_actions(self, message_history: List[MessageTableModel], possible_actions: List[str]) -> List[Action]:
+        """Async produce_actions, awaiting the LLM without blocking the event loop."""
+        prompt = self._build_prompt(message_history, possible_actions)
+        content = await self.llm.agenerate_response(
+            [{"role": "user", "content": prompt}], cache=True, temperature=0
+        )
+        return self._parse_actions(content, possible_actions)
+
+    def _fit_history(self, lines: List[str]) -> List[str]:
+        """The most recent history lines within the token budget (at least the last one)."""
+        if self.history_token_budget is None:
+            return lines
+
+        kept, used = [], 0
+        for line in reversed(lines):
+            # +1 for the newline joining the lines
+            tokens = count_tokens(line, self.llm.model) + 1
+            if kept and used + tokens > self.history_token_budget:
+                break
+            kept.append(line)
+            used += tokens
+
+        if len(kept) < len(lines):
+            metrics.incr("intent.history_dropped", len(lines) - len(kept))
+        return kept[::-1]
+
+    def _build_prompt(self, message_history: List[MessageTableModel], possible_actions: List[str]) -> str:
+        history_str = "\n".join(self._fit_history([
             f"{'User' if msg.from_user else 'Bot'}: {msg.message}"
             for msg in message_history
-        ])
+        ]))
 
         actions_str = ", ".join(possible_actions)
 
@@ -32,15 +72,15 @@ class IntentManager:
             }
         }
 
-        prompt = render_jinja_template(
+        return render_jinja_template(
             "autonomous.jinja",
-            "zootopia/intent/templates",
+            "zootopia/controller/intent/templates",
             message_history=history_str,
             possible_actions=actions_str,
             response_structure=json.dumps(response_structure, indent=2)
         )
 
-        content = self.llm.generate_response([{"role": "user", "content": prompt}])
+    def _parse_actions(self, content: str, possible_actions: List[str]) -> List[Action]:
         cleaned = clean_and_parse_llm_json_output(content)
         
         if isinstance(cleaned, dict) and 'action' in cleaned and 'args' in cleaned:
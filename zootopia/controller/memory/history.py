@@ -1,7 +1,25 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from zootopia.core.logger import logger
 from zootopia.core.schema import Tables, MessageTableModel
 from zootopia.controller.context.context import ContextManager
+from zootopia.storage.database.recent import RecentMessages
+from zootopia.storage.database.writer import MessageWriter
+
+HISTORY_COLUMNS = (
+    Tables.MESSAGES__created_at.value,
+    Tables.MESSAGES__from_user.value,
+    Tables.MESSAGES__message.value,
+)
+
+
+def _row_key(message: MessageTableModel) -> tuple:
+    """Identifies a message row whether it came from the DB or the write buffer."""
+    created_at = message.created_at
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return (created_at, message.from_user, message.message)
+
 
 class ShortTermHistory:
     """
@@ -9,14 +27,21 @@ class ShortTermHistory:
     An agent can send this in the prompt or use it for other purpose.
     """
 
-    def __init__(self, context):
+    def __init__(
+        self,
+        context,
+        message_writer: Optional[MessageWriter] = None,
+        recent_messages: Optional[RecentMessages] = None,
+    ):
         """
         Initialize the empty list of events
         """
         self.context: ContextManager = context
+        self.message_writer = message_writer
+        self.recent_messages = recent_messages
         self.messages: List[MessageTableModel] = []
 
-    def get_recent_messages(self, count: int = 10) -> List[MessageTableModel]:
+    async def get_recent_messages(self, count: int = 10) -> List[MessageTableModel]:
         """
         Get the most recent messages for a given room ID.
 
@@ -27,20 +52,54 @@ class ShortTermHistory:
         - List[MessageTableModel]: A list of the most recent messages for the room.
         """
         try:
-            messages = self.context.database.get_multiple_rows(
-                table_name=Tables.MESSAGES.value,
-                max_rows=count,
+            # Served from the room's Redis list once it's seeded
+            if self.recent_messages is not None:
+                recent = await self.recent_messages.get(self.context.room.id, count)
+                if recent is not None:
+                    self.messages = recent
+                    return self.messages
+
+            # On a miss read enough rows to seed the whole list, not just `count`
+            max_rows = (
+                max(count, self.recent_messages.max_size)
+                if self.recent_messages is not None
+                else count
+            )
+
+            # Read the write buffer first: a row flushed during the query is then in one of both
+            pending = (
+                self.message_writer.pending(self.context.room.id)
+                if self.message_writer is not None
+                else []
+            )
+            self.messages = await self.context.database.get_multiple_rows(
+                Tables.MESSAGES.value,
+                (Tables.MESSAGES__room_id.value, self.context.room.id),
+                max_rows=max_rows,
                 order_by=Tables.MESSAGES__created_at.value,
                 order_desc=True,
-                conditions=[(Tables.MESSAGES__room_id.value, self.context.room.id)]
+                # Rows we wrote ourselves: fetch only what the prompt uses, unvalidated
+                columns=HISTORY_COLUMNS,
+                trusted=True,
             )
-            
-            # Convert database results to MessageTableModel instances
-            self.messages = [MessageTableModel(**message) for message in messages]
 
             # Reverse the list to get chronological order (oldest to newest)
             self.messages.reverse()
 
+            # Only from the database: buffered rows are in the list already, pushed
+            # when saved, and another worker's buffer isn't visible from here
+            if self.recent_messages is not None:
+                await self.recent_messages.seed(self.context.room.id, self.messages)
+
+            # Add the messages still waiting to be written, skipping any written meanwhile
+            if pending:
+                written = {_row_key(message) for message in self.messages}
+                self.messages += [
+                    message for message in pending if _row_key(message) not in written
+                ]
+                self.messages = self.messages[-max_rows:]
+
+            self.messages = self.messages[-count:]
             return self.messages
         except Exception as e:
             logger.error(f"Error fetching recent messages for room {self.context.room.id}: {str(e)}")
@@ -1,5 +1,8 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -13,5 +16,19 @@ file_handler.setFormatter(formatter)
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+# Records are only enqueued on the caller's thread (the event loop), file and
+# console writes happen on the listener thread
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_listener = QueueListener(
+    log_queue, file_handler, console_handler, respect_handler_level=True
+)
+queue_listener.start()
+atexit.register(queue_listener.stop)
+
+logger.addHandler(QueueHandler(log_queue))
+
+# One JSON object per line, written through the same queue
+access_logger = logging.getLogger(f"{__name__}.access")
+access_logger.setLevel(logging.INFO)
+access_logger.propagate = False
+access_logger.addHandler(QueueHandler(log_queue))
@@ -0,0 +1,112 @@
+"""Process-local metrics: counters, gauges and latency percentiles"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List
+
+
+def _key(name: str, tags: dict) -> str:
+    """Returns `name{k=v,...}`, the key a metric is stored under."""
+    if not tags:
+        return name
+    labels = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
+    return f"{name}{{{labels}}}"
+
+
+def _percentile(sorted_samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    index = max(0, int(round(percent / 100 * len(sorted_samples))) - 1)
+    return sorted_samples[min(index, len(sorted_samples) - 1)]
+
+
+class Metrics:
+    """
+    Thread-safe registry shared by the whole process.
+    Timings keep the most recent `max_samples` observations per key.
+    """
+
+    def __init__(self, max_samples: int = 10000) -> None:
+        self._lock = threading.Lock()
+        self._max_samples = max_samples
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        self._timings: Dict[str, Deque[float]] = {}
+
+    def incr(self, name: str, value: float = 1, **tags) -> None:
+        """Increments a counter."""
+        with self._lock:
+            self._counters[_key(name, tags)] += value
+
+    def set_gauge(self, name: str, value: float, **tags) -> None:
+        """Sets a gauge to its current value."""
+        with self._lock:
+            self._gauges[_key(name, tags)] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], float], **tags) -> None:
+        """Registers a gauge whose value is read from `callback` at snapshot time."""
+        with self._lock:
+            self._gauge_callbacks[_key(name, tags)] = callback
+
+    def observe(self, name: str, seconds: float, **tags) -> None:
+        """Records one latency sample."""
+        key = _key(name, tags)
+        with self._lock:
+            samples = self._timings.get(key)
+            if samples is None:
+                samples = self._timings[key] = deque(maxlen=self._max_samples)
+            samples.append(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **tags) -> Iterator[None]:
+        """Records the duration of the `with` block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **tags)
+
+    def summary(self, name: str, **tags) -> Dict[str, float]:
+        """Returns count, mean and p50/p95/p99 (in ms) of a timing."""
+        with self._lock:
+            samples = sorted(self._timings.get(_key(name, tags), ()))
+        return self._summarize(samples)
+
+    def snapshot(self) -> dict:
+        """Returns every metric, timings summarized."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            callbacks = dict(self._gauge_callbacks)
+            timings = {key: sorted(samples) for key, samples in self._timings.items()}
+        gauges.update({key: callback() for key, callback in callbacks.items()})
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "timings": {key: self._summarize(samples) for key, samples in timings.items()},
+        }
+
+    def reset(self) -> None:
+        """Forgets every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._gauge_callbacks.clear()
+            self._timings.clear()
+
+    @staticmethod
+    def _summarize(samples: List[float]) -> Dict[str, float]:
+        if not samples:
+            return {"count": 0}
+        return {
+            "count": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+            "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        }
+
+
+metrics = Metrics()
@@ -1,25 +1,49 @@
-from fastapi import APIRouter, Request
-import json
+from fastapi import APIRouter, Request, Response, status
+import orjson
 
-from config.config import config
-from zootopia.controller import AgentController, ContextManager
 from zootopia.core.logger import logger
+from zootopia.platform.registry import ProviderRegistry
 
 router = APIRouter()
 
 
 @router.post("/message")
-async def message_webhook(request: Request):
-    try: 
-        request_body = json.loads(await request.body())
-        context = ContextManager(request_body, config)
-        logger.info(f"Received {context.message.provider.value}) message: "
-            f"{context.message}"
-        )
-
-        zootopian = AgentController(context)
-        await zootopian.handle_message()
-    except Exception as e:
-        logger.info("Error")
-    
-    return {"message": "Received"}
\ No newline at end of file
+async def message_webhook(request: Request, response: Response):
+    """Validates the webhook body and hands it to the ingest queue."""
+    try:
+        request_body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        logger.warning("Received webhook with a non-JSON body, ignoring.")
+        return {"message": "Ignored"}
+
+    # Acknowledge unknown payloads so the sender doesn't retry them forever
+    if not isinstance(request_body, dict) or not (
+        "payload" in request_body or "update_id" in request_body
+    ):
+        logger.warning("Received webhook from an unknown messaging platform, ignoring.")
+        return {"message": "Ignored"}
+
+    deduplicator = request.app.state.deduplicator
+    if await deduplicator.is_duplicate(request_body):
+        logger.info("Dropped a redelivered webhook.")
+        return {"message": "Duplicate"}
+
+    # Shed load before queueing; a 503 with Retry-After is retried by the sender
+    provider = ProviderRegistry.detect(request_body)
+    admission = request.app.state.admission
+    ingest_queue = request.app.state.ingest_queue
+    rejection = admission.admit(provider, ingest_queue.depth)
+    if rejection is None and not ingest_queue.submit(
+        request_body, on_done=lambda: admission.release(provider)
+    ):
+        admission.release(provider)
+        rejection = "queue_closed"
+        admission.reject(provider, rejection)
+
+    if rejection is not None:
+        await deduplicator.forget(request_body)
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        response.headers["Retry-After"] = str(admission.retry_after_seconds)
+        return {"message": "Busy"}
+
+    return {"message": "Received"}
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from zootopia.core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Returns this worker's counters, gauges and latency percentiles."""
+    return metrics.snapshot()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
-from typing import Dict, Union
+from typing import AsyncIterator, Dict, Union
 
 
 __all__ = ['ActionType', 'Action', 'ActionResults']
@@ -14,7 +14,7 @@ class Action:
 class ActionResult:
     action: Action
     success: bool
-    result: Union[str, Dict]
+    result: Union[str, Dict, AsyncIterator[str]]  # chunks of a streamed reply
 
 
 class ActionTypeSchema(BaseModel):
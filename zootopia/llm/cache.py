@@ -0,0 +1,105 @@
+"""Response cache for deterministic LLM calls"""
+
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+import orjson
+from cachetools import TTLCache
+
+from config.config import LLMCacheConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+
+
+class LLMCache:
+    """
+    Caches LLM responses keyed on model, messages and call parameters, so a
+    byte-identical prompt (e.g. "hi" to a new user) doesn't cost a round trip.
+    An in-process TTL/LRU tier answers most lookups and an optional Redis tier
+    shares entries between workers; the sync API only uses the local tier.
+
+    Only call sites that opt in (`cache=True`) are cached: a sampled response
+    would otherwise be replayed to every identical prompt.
+    """
+
+    KEY_PREFIX = "llm"
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: int = 3600,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: TTLCache = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        self._redis = None
+        if redis_url:
+            from redis import asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+    @classmethod
+    def from_config(cls, config: LLMCacheConfig, redis_url: Optional[str] = None) -> "LLMCache":
+        """Instantiate and return a LLMCache object."""
+        return cls(
+            max_size=config.MAX_SIZE,
+            ttl_seconds=config.TTL_SECONDS,
+            redis_url=redis_url if config.USE_REDIS else None,
+        )
+
+    @classmethod
+    def key(cls, model: str, messages: List[Dict[str, str]], params: dict) -> str:
+        """Cache key of a call: a hash of everything that shapes the response."""
+        payload = orjson.dumps(
+            {"model": model, "messages": messages, "params": params},
+            option=orjson.OPT_SORT_KEYS,
+            default=str,
+        )
+        return f"{cls.KEY_PREFIX}:{hashlib.sha256(payload).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns a cached response from the local tier."""
+        with self._lock:
+            response = self._entries.get(key)
+        metrics.incr("llm.cache", result="hit" if response is not None else "miss", tier="local")
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Caches a response in the local tier."""
+        with self._lock:
+            self._entries[key] = response
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Returns a cached response from the local tier, then Redis."""
+        response = self.get(key)
+        if response is not None or self._redis is None:
+            return response
+        try:
+            value = await self._redis.get(key)
+        except Exception as e:
+            # Fail open: a miss only costs an LLM call
+            logger.error(f"Error reading LLM cache from Redis: {e}")
+            return None
+        metrics.incr("llm.cache", result="hit" if value is not None else "miss", tier="redis")
+        if value is None:
+            return None
+        response = value.decode()
+        self.set(key, response)
+        return response
+
+    async def aset(self, key: str, response: str) -> None:
+        """Caches a response in both tiers."""
+        self.set(key, response)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, response, ex=self._ttl_seconds)
+        except Exception as e:
+            logger.error(f"Error writing LLM cache to Redis: {e}")
+
+    async def aclose(self) -> None:
+        """Closes the Redis connection, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
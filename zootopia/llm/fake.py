@@ -0,0 +1,40 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from zootopia.llm.llm import LLM
+
+DEFAULT_RESPONSE = '{"action": "message", "args": {"content": "Hi! How can I help?"}}'
+
+
+class FakeLLM(LLM):
+    """LLM stand-in for tests and benchmarks: fixed reply after a fixed delay, no network."""
+
+    def __init__(
+        self, model: str = "fake", latency: float = 0.5, response: str = DEFAULT_RESPONSE
+    ):
+        super().__init__(model)
+        self.latency: float = latency
+        self.response: str = response
+
+    def _generate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        time.sleep(self.latency)
+        return self.response
+
+    async def _agenerate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        await asyncio.sleep(self.latency)
+        return self.response
+
+    async def _astream(self, prepared_messages: List[Dict[str, str]], **kwargs):
+        words = self.response.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            yield word if i == 0 else f" {word}"
+
+    def generate_stream(
+        self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs
+    ):
+        words = self.response.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.latency / len(words))
+            yield word if i == 0 else f" {word}"
@@ -1,11 +1,94 @@
-from typing import List, Dict, Optional
-from litellm import completion
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional
+
+import httpx
+
+from config.config import LLMConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.llm.cache import LLMCache
+
+# Model name prefixes of the providers in LLMConfig, for models given without "provider/"
+_MODEL_PREFIXES = {
+    "gpt": "OPENAI",
+    "o1": "OPENAI",
+    "claude": "ANTHROPIC",
+    "gemini": "GEMINI",
+}
+
+
+def provider_of(model: str) -> str:
+    """Returns the LLMConfig provider of a LiteLLM model name, e.g. GROQ for groq/llama3-8b."""
+    if "/" in model:
+        return model.split("/", 1)[0].upper()
+    for prefix, provider in _MODEL_PREFIXES.items():
+        if model.startswith(prefix):
+            return provider
+    return "DEFAULT"
+
+
+class LLMLimits:
+    """
+    Per-provider concurrency limits and the HTTP connection pool shared by every
+    async LLM call of the process. Calls past a provider's limit wait for a slot
+    instead of running into its rate limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[Dict[str, int]] = None,
+        default_max_concurrency: int = 16,
+        max_connections: int = 100,
+        timeout: float = 60,
+    ) -> None:
+        self._max_concurrency = max_concurrency or {}
+        self._default_max_concurrency = default_max_concurrency
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            timeout=timeout,
+        )
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "LLMLimits":
+        """Instantiate and return a LLMLimits object."""
+        return cls(
+            max_concurrency=config.MAX_CONCURRENCY,
+            default_max_concurrency=config.DEFAULT_MAX_CONCURRENCY,
+            max_connections=config.MAX_CONNECTIONS,
+            timeout=config.TIMEOUT_SECONDS,
+        )
+
+    def semaphore(self, provider: str) -> asyncio.Semaphore:
+        """The semaphore bounding concurrent calls to `provider`."""
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            size = self._max_concurrency.get(provider, self._default_max_concurrency)
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(size)
+        return semaphore
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        litellm = sys.modules.get("litellm")
+        if litellm is not None and litellm.aclient_session is self.client:
+            litellm.aclient_session = None
+        await self.client.aclose()
+
 
 class LLM:
     """Class for Large Language Models (LLMs) usage powered by LiteLLM"""
 
-    def __init__(self, model: str):
+    def __init__(
+        self, model: str, limits: Optional[LLMLimits] = None, cache: Optional[LLMCache] = None
+    ):
         self.model: str = model
+        self.provider: str = provider_of(model)
+        self.limits: Optional[LLMLimits] = limits
+        self.cache: Optional[LLMCache] = cache
 
     def _prepare_messages(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
         """Prepend the system prompt to the messages if it exists."""
@@ -13,23 +96,145 @@ class LLM:
             return [{"role": "system", "content": system_prompt}] + messages
         return messages
 
-    def generate_response(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs) -> str:
+    def _cache_key(self, cache: bool, messages: List[Dict[str, str]], params: dict) -> Optional[str]:
+        """The response cache key of a call, or None if the call isn't cached."""
+        if not cache or self.cache is None:
+            return None
+        return LLMCache.key(self.model, messages, params)
+
+    def generate_response(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, cache: bool = False, **kwargs) -> str:
         """
         Generate a response using the specified model.
         
         :param messages: List of message dictionaries with 'role' and 'content' keys
         :param system_prompt: Optional system prompt to guide the model's behavior
+        :param cache: Reuse the response of an identical earlier call (deterministic prompts only)
         :param kwargs: Additional arguments to pass to the litellm completion function
         :return: The generated response as a string
         """
+        prepared_messages = self._prepare_messages(messages, system_prompt)
+        cache_key = self._cache_key(cache, prepared_messages, kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            prepared_messages = self._prepare_messages(messages, system_prompt)
-            response = completion(model=self.model, messages=prepared_messages, **kwargs)
-            return response.choices[0].message.content
+            content = self._generate(prepared_messages, **kwargs)
         except Exception as e:
             print(f"Error generating response: {e}")
             return ""
 
+        if cache_key is not None and content:
+            self.cache.set(cache_key, content)
+        return content
+
+    async def agenerate_response(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, cache: bool = False, **kwargs) -> str:
+        """
+        Async generate_response: awaits the model without blocking the event loop,
+        within the concurrency limit of the model's provider.
+
+        :param messages: List of message dictionaries with 'role' and 'content' keys
+        :param system_prompt: Optional system prompt to guide the model's behavior
+        :param cache: Reuse the response of an identical earlier call (deterministic prompts only)
+        :param kwargs: Additional arguments to pass to the litellm acompletion function
+        :return: The generated response as a string
+        """
+        prepared_messages = self._prepare_messages(messages, system_prompt)
+        cache_key = self._cache_key(cache, prepared_messages, kwargs)
+        if cache_key is not None:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            content = await self._agenerate(prepared_messages, **kwargs)
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return ""
+
+        if cache_key is not None and content:
+            await self.cache.aset(cache_key, content)
+        return content
+
+    def _generate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        """One completion call; raises on failure."""
+        # litellm takes seconds to import, so it is loaded on the first call
+        from litellm import completion
+
+        try:
+            response = completion(model=self.model, messages=prepared_messages, **kwargs)
+        except Exception:
+            metrics.incr("llm.errors", provider=self.provider)
+            raise
+        return response.choices[0].message.content
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Holds one of the provider's concurrent request slots, if limited."""
+        if self.limits is None:
+            yield
+            return
+
+        import litellm
+
+        # OpenAI-compatible providers reuse this client's connections
+        if litellm.aclient_session is None:
+            litellm.aclient_session = self.limits.client
+        semaphore = self.limits.semaphore(self.provider)
+        with metrics.timer("llm.queue_wait", provider=self.provider):
+            await semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def _agenerate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        """One acompletion call, within the provider's limit; raises on failure."""
+        import litellm
+
+        async with self._slot():
+            try:
+                with metrics.timer("llm.request", provider=self.provider):
+                    response = await litellm.acompletion(
+                        model=self.model, messages=prepared_messages, **kwargs
+                    )
+            except Exception:
+                metrics.incr("llm.errors", provider=self.provider)
+                raise
+        return response.choices[0].message.content
+
+    async def agenerate_stream(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Async generate_stream: yields response chunks as the model produces them.
+
+        :param messages: List of message dictionaries with 'role' and 'content' keys
+        :param system_prompt: Optional system prompt to guide the model's behavior
+        :param kwargs: Additional arguments to pass to the litellm acompletion function
+        :return: An async iterator of response chunks, ending early on error
+        """
+        prepared_messages = self._prepare_messages(messages, system_prompt)
+        try:
+            async for chunk in self._astream(prepared_messages, **kwargs):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error generating streaming response: {e}")
+
+    async def _astream(self, prepared_messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """One streamed acompletion call, within the provider's limit; raises on failure."""
+        import litellm
+
+        async with self._slot():
+            try:
+                response = await litellm.acompletion(
+                    model=self.model, messages=prepared_messages, stream=True, **kwargs
+                )
+                async for chunk in response:
+                    yield chunk.choices[0].delta.content or ""
+            except Exception:
+                metrics.incr("llm.errors", provider=self.provider)
+                raise
+
     def generate_stream(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs):
         """
         Generate a streaming response using the specified model.
@@ -39,6 +244,8 @@ class LLM:
         :param kwargs: Additional arguments to pass to the litellm completion function
         :return: A generator yielding response chunks
         """
+        from litellm import completion
+
         try:
             prepared_messages = self._prepare_messages(messages, system_prompt)
             response = completion(model=self.model, messages=prepared_messages, stream=True, **kwargs)
@@ -0,0 +1,174 @@
+"""Hedged, failing-over LLM requests across an ordered list of providers"""
+
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from config.config import LLMConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.llm.cache import LLMCache
+from zootopia.llm.llm import LLM, LLMLimits
+
+
+class LLMRouter(LLM):
+    """
+    Sends each request to the first of `routes`. If it hasn't answered within its
+    own `hedge_percentile` latency, the same request also goes to the next route
+    and the first answer wins, the other request being cancelled. A route that
+    fails is replaced by the next one. Only when every route failed does the call
+    fail (an empty response, as with a single LLM).
+
+    Until a route has `min_samples` latencies, `default_hedge_delay` seconds is used.
+    """
+
+    def __init__(
+        self,
+        routes: List[LLM],
+        hedge_percentile: float = 95,
+        min_samples: int = 50,
+        default_hedge_delay: float = 2.0,
+        max_samples: int = 1000,
+        cache: Optional[LLMCache] = None,
+    ) -> None:
+        if not routes:
+            raise ValueError("LLMRouter needs at least one route")
+        super().__init__(
+            model="router:" + ",".join(route.model for route in routes), cache=cache
+        )
+        self.routes = routes
+        self._hedge_percentile = hedge_percentile
+        self._min_samples = min_samples
+        self._default_hedge_delay = default_hedge_delay
+        self._latencies: Dict[str, Deque[float]] = {
+            route.model: deque(maxlen=max_samples) for route in routes
+        }
+
+    @classmethod
+    def from_config(
+        cls,
+        config: LLMConfig,
+        limits: Optional[LLMLimits] = None,
+        cache: Optional[LLMCache] = None,
+    ) -> "LLMRouter":
+        """Instantiate and return a LLMRouter object."""
+        routes = []
+        for provider in config.ROUTER.PROVIDERS:
+            model = getattr(config, provider, {}).get("MODEL")
+            if not model:
+                raise ValueError(
+                    f"LLM_CONFIG.{provider}.MODEL is needed to route to {provider}"
+                )
+            routes.append(LLM(model, limits=limits))
+        return cls(
+            routes,
+            hedge_percentile=config.ROUTER.HEDGE_PERCENTILE,
+            min_samples=config.ROUTER.MIN_SAMPLES,
+            default_hedge_delay=config.ROUTER.DEFAULT_HEDGE_DELAY_SECONDS,
+            cache=cache,
+        )
+
+    def hedge_delay(self, route: LLM) -> float:
+        """Seconds to wait for `route` before hedging: its recent latency percentile."""
+        samples = sorted(self._latencies[route.model])
+        if len(samples) < self._min_samples:
+            return self._default_hedge_delay
+        index = max(0, int(round(self._hedge_percentile / 100 * len(samples))) - 1)
+        return samples[min(index, len(samples) - 1)]
+
+    def _generate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        # A blocking call can't be raced, so the sync API only fails over
+        error: Optional[Exception] = None
+        for index, route in enumerate(self.routes):
+            if index:
+                metrics.incr("llm.router.failovers", provider=route.provider)
+            try:
+                return route._generate(prepared_messages, **kwargs)
+            except Exception as e:
+                error = e
+                logger.warning(f"LLM {route.model} failed: {e}")
+        raise error
+
+    async def _astream(self, prepared_messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        # Once chunks went out they can't be taken back, so streams fail over
+        # only before their first chunk, and aren't hedged
+        error: Optional[Exception] = None
+        for index, route in enumerate(self.routes):
+            if index:
+                metrics.incr("llm.router.failovers", provider=route.provider)
+            started = False
+            try:
+                async for chunk in route._astream(prepared_messages, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                error = e
+                logger.warning(f"LLM {route.model} failed: {e}")
+        raise error
+
+    async def _agenerate(self, prepared_messages: List[Dict[str, str]], **kwargs) -> str:
+        remaining = iter(self.routes)
+        pending: Dict[asyncio.Task, tuple] = {}
+        hedged = False
+        # Hedged-against requests: the delay each is known to have exceeded
+        exceeded: Dict[asyncio.Task, float] = {}
+        error: Optional[Exception] = None
+
+        def launch(route: LLM) -> None:
+            task = asyncio.create_task(route._agenerate(prepared_messages, **kwargs))
+            pending[task] = (route, time.perf_counter())
+
+        primary = next(remaining)
+        launch(primary)
+        next_route = next(remaining, None)
+
+        try:
+            while pending:
+                timeout = (
+                    self.hedge_delay(primary) if next_route is not None and not hedged else None
+                )
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # The primary is in its slow tail: race the next route against it
+                    metrics.incr("llm.router.hedges", provider=next_route.provider)
+                    exceeded.update((task, timeout) for task in pending)
+                    launch(next_route)
+                    next_route = next(remaining, None)
+                    hedged = True
+                    continue
+
+                for task in done:
+                    route, started = pending.pop(task)
+                    if task.exception() is None:
+                        self._latencies[route.model].append(time.perf_counter() - started)
+                        metrics.incr("llm.router.wins", provider=route.provider)
+                        return task.result()
+                    error = task.exception()
+                    logger.warning(f"LLM {route.model} failed: {error}")
+
+                    # Replace a failed route right away, even while a slow one is still pending
+                    if next_route is not None:
+                        metrics.incr("llm.router.failovers", provider=next_route.provider)
+                        if not pending:
+                            # Alone again: it can be hedged like the first route
+                            primary, hedged = next_route, False
+                        launch(next_route)
+                        next_route = next(remaining, None)
+        finally:
+            # Cancel the losing requests, releasing their provider slots and connections.
+            # A hedged-against one still counts as a sample at the delay it exceeded
+            # (censored), so its slow tail keeps the hedge delay from drifting down.
+            for task, (route, _) in pending.items():
+                task.cancel()
+                if task in exceeded:
+                    self._latencies[route.model].append(exceeded[task])
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise error
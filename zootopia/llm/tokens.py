@@ -0,0 +1,86 @@
+"""Token counts of prompt parts, for keeping prompts within a budget"""
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Set
+
+from zootopia.core.logger import logger
+
+# Encoding used for models tiktoken doesn't know (non-OpenAI): close enough for budgeting
+FALLBACK_ENCODING = "cl100k_base"
+# How long to estimate before trying to load a model's encoding again
+ENCODING_RETRY_SECONDS = 60
+
+_encodings: Dict[str, str] = {}
+_encoding_failed_at: Dict[str, float] = {}
+_loading: Set[str] = set()
+
+
+def load_encoding(model: str) -> Optional[str]:
+    """
+    Loads the tiktoken encoding of a model, or returns None if it can't be loaded.
+    Blocking: tiktoken may download the encoding, so keep it off the event loop.
+    """
+    try:
+        import tiktoken
+
+        try:
+            name = tiktoken.encoding_for_model(model.split("/")[-1]).name
+        except KeyError:
+            name = tiktoken.get_encoding(FALLBACK_ENCODING).name
+    except Exception as e:
+        # e.g. no network to fetch the encoding: estimate rather than fail the prompt
+        logger.warning(f"No tiktoken encoding for {model}, estimating token counts: {e}")
+        _encoding_failed_at[model] = time.monotonic()
+        return None
+    finally:
+        _loading.discard(model)
+
+    _encodings[model] = name
+    _encoding_failed_at.pop(model, None)
+    return name
+
+
+def _encoding_name(model: str) -> Optional[str]:
+    """
+    The tiktoken encoding of a model, or None (estimate) until it is loaded.
+    Only loaded encodings are cached: a failure (e.g. offline at startup) is
+    retried after ENCODING_RETRY_SECONDS. On the event loop the retry runs in a
+    worker thread, and counts are estimated until it succeeds.
+    """
+    name = _encodings.get(model)
+    if name is not None:
+        return name
+    failed_at = _encoding_failed_at.get(model)
+    if failed_at is not None and time.monotonic() - failed_at < ENCODING_RETRY_SECONDS:
+        return None
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Not on the event loop (e.g. the warm-up in a worker thread): load here
+        return load_encoding(model)
+
+    if model not in _loading:
+        _loading.add(model)
+        loop.run_in_executor(None, load_encoding, model)
+    return None
+
+
+@lru_cache(maxsize=10000)
+def _count(encoding_name: Optional[str], text: str) -> int:
+    if encoding_name is None:
+        return len(text) // 4 + 1
+
+    import tiktoken
+
+    return len(tiktoken.get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Number of tokens of `text` for `model`. Counts are cached per text and
+    encoding, so a message is only encoded once however many prompts it is in.
+    """
+    return _count(_encoding_name(model), text)
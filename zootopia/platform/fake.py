@@ -0,0 +1,33 @@
+import asyncio
+from typing import List, Type
+
+from zootopia.platform.platform import MessageProviderBase
+from zootopia.platform.models import ZootopiaMessage
+
+
+class FakeMessageProvider(MessageProviderBase):
+    """
+    Messaging stand-in for tests and benchmarks: parses webhooks like `provider`,
+    and "sends" replies after a fixed delay, to nowhere.
+    """
+
+    def __init__(self, provider: Type[MessageProviderBase], latency: float = 0.05):
+        self._provider = provider
+        self.latency: float = latency
+        self.sent: List[str] = []
+
+    @classmethod
+    def from_config(cls, provider: Type[MessageProviderBase]) -> "FakeMessageProvider":
+        """Instantiate and return a FakeMessageProvider object."""
+        return cls(provider)
+
+    def receive_message(self, request_body) -> ZootopiaMessage:
+        return self._provider.receive_message(request_body)
+
+    async def send_message(self, message: str, user_id) -> str:
+        await asyncio.sleep(self.latency)
+        self.sent.append(message)
+        return str(len(self.sent))
+
+    async def register_webhook(self, webhook_url: str) -> bool:
+        return True
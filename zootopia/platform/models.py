@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Optional, Union, Dict, Any
+from typing import Annotated, List, Optional, Union, Dict, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag
 
 class _TelegramPhoto(BaseModel):
     file_id: str
@@ -70,8 +70,10 @@ class _TelegramChat(BaseModel):
 
 
 class _TelegramMessageBase(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     message_id: int
-    from_: _TelegramUser
+    from_: _TelegramUser = Field(alias="from")
     chat: _TelegramChat
     date: int
 
@@ -98,14 +100,28 @@ class _TelegramMessageDocument(_TelegramMessageBase):
     document: _TelegramDocument
 
 
+_TELEGRAM_MESSAGE_KINDS = ("text", "photo", "sticker", "location", "document")
+
+
+def _telegram_message_kind(message: Any) -> Optional[str]:
+    """Tags a Telegram message by its content key, so only one union member is tried."""
+    for kind in _TELEGRAM_MESSAGE_KINDS:
+        if (kind in message) if isinstance(message, dict) else hasattr(message, kind):
+            return kind
+    return None
+
+
 class TelegramMessage(BaseModel):
     update_id: int
-    message: Union[
-        _TelegramMessageText,
-        _TelegramMessagePhoto,
-        _TelegramMessageSticker,
-        _TelegramMessageLocation,
-        _TelegramMessageDocument,
+    message: Annotated[
+        Union[
+            Annotated[_TelegramMessageText, Tag("text")],
+            Annotated[_TelegramMessagePhoto, Tag("photo")],
+            Annotated[_TelegramMessageSticker, Tag("sticker")],
+            Annotated[_TelegramMessageLocation, Tag("location")],
+            Annotated[_TelegramMessageDocument, Tag("document")],
+        ],
+        Discriminator(_telegram_message_kind),
     ]
 
 class MessageProvider(Enum):
@@ -131,3 +147,10 @@ class ZootopiaMessage(BaseModel):
     metadata: Union[TelegramMetadata, BirdMetadata]
     provider: MessageProvider
     type: MessageType
+
+    @property
+    def text(self) -> str:
+        """Text of the message, empty for photos, stickers, etc."""
+        if isinstance(self.content, str):
+            return self.content
+        return getattr(self.content.message, "text", "")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import Request
 
@@ -24,6 +24,20 @@ class MessageProviderBase(ABC):
         """Send a message to a recipient."""
         pass
 
+    async def send_stream(self, chunks: AsyncIterator[str], user_id) -> Optional[str]:
+        """
+        Send a message whose text arrives in chunks (e.g. a streamed LLM reply).
+        Providers that can't edit a sent message (SMS) send it once complete.
+        """
+        text = "".join([chunk async for chunk in chunks])
+        if not text.strip():
+            return None
+        return await self.send_message(text, user_id)
+
+    async def aclose(self) -> None:
+        """Closes the provider's pooled connections, if any."""
+        pass
+
     @abstractmethod
     async def register_webhook(self, webhook_url: str) -> bool:
         """Register a webhook URL for receiving updates."""
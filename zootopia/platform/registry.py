@@ -0,0 +1,65 @@
+"""Application-scoped registry of messaging providers"""
+
+import threading
+from typing import Callable, Dict
+
+from config.config import MessagingConfig
+from zootopia.platform.platform import MessageProviderBase
+from zootopia.platform.models import MessageProvider
+
+
+class ProviderRegistry:
+    """
+    Builds each messaging provider once, on first use, and shares it between requests.
+    Providers hold no per-message state: recipients are passed to `send_message`.
+    """
+
+    def __init__(self, factories: Dict[MessageProvider, Callable[[], MessageProviderBase]]):
+        self._factories = factories
+        self._providers: Dict[MessageProvider, MessageProviderBase] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: MessagingConfig) -> "ProviderRegistry":
+        """Instantiate and return a ProviderRegistry object."""
+
+        def bird() -> MessageProviderBase:
+            from zootopia.platform.sms.bird import BirdSMSProvider
+
+            return BirdSMSProvider.from_config(config.BIRD)
+
+        def telegram() -> MessageProviderBase:
+            from zootopia.platform.telegram.telegram import Telegram
+
+            return Telegram.from_config(config.TELEGRAM)
+
+        return cls({MessageProvider.BIRD: bird, MessageProvider.TELEGRAM: telegram})
+
+    @staticmethod
+    def detect(request_body: dict) -> MessageProvider:
+        """Returns which messaging platform sent the request body."""
+        if "payload" in request_body:
+            return MessageProvider.BIRD
+        elif "update_id" in request_body:
+            return MessageProvider.TELEGRAM
+        else:
+            raise NotImplementedError("Messaging platform not implemented yet.")
+
+    def get(self, provider: MessageProvider) -> MessageProviderBase:
+        """Returns the shared instance of a provider, building it on first use."""
+        instance = self._providers.get(provider)
+        if instance is None:
+            with self._lock:
+                instance = self._providers.get(provider)
+                if instance is None:
+                    instance = self._providers[provider] = self._factories[provider]()
+        return instance
+
+    def for_request(self, request_body: dict) -> MessageProviderBase:
+        """Returns the provider that sent the request body."""
+        return self.get(self.detect(request_body))
+
+    async def aclose(self) -> None:
+        """Closes the providers built so far."""
+        for provider in self._providers.values():
+            await provider.aclose()
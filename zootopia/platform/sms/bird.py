@@ -1,6 +1,8 @@
 """SMS Messaging class utilizing Bird API"""
 
-from typing import Any, Dict, Optional, cast
+from typing import Any, Dict, Optional, Union, cast
+import httpx
+import orjson
 import requests
 from config.config import BirdConfig
 from zootopia.core.logger import logger
@@ -23,9 +25,10 @@ class BirdSMSProvider(MessageProviderBase):
         workspace_id: str,
         api_key: str,
         signing_key: str,
-        channel_id: str
+        channel_id: str,
+        timeout: float = 10,
     ):
-        """Initialize Bird credentials."""
+        """Initialize Bird credentials and the pooled client used to send messages."""
         self._api_url = bird_url
         self._api_header = {
             "Authorization": f"AccessKey {api_key}",
@@ -34,8 +37,9 @@ class BirdSMSProvider(MessageProviderBase):
         self._signing_key = signing_key
         self._organization_id = organization_id
         self._workspace_id = workspace_id
-        self._user_phone = None
         self._channel_id = channel_id
+        # Sends run on the shared event loop: never block it, nor wait forever
+        self._client = httpx.AsyncClient(headers=self._api_header, timeout=timeout)
 
     @classmethod
     def from_config(cls, config: BirdConfig) -> "BirdSMSProvider":
@@ -48,25 +52,30 @@ class BirdSMSProvider(MessageProviderBase):
         channel_id = config.BIRD_CHANNEL_ID
 
         return cls(
-            bird_url, organization_id, workspace_id, api_key, signing_key, channel_id
+            bird_url,
+            organization_id,
+            workspace_id,
+            api_key,
+            signing_key,
+            channel_id,
+            timeout=config.BIRD_TIMEOUT_SECONDS,
         )
     
     # TODO: Handle images and files
     @classmethod
-    def receive_message(self, request_body: dict) -> ZootopiaMessage:
+    def receive_message(cls, request_body: Union[bytes, str, dict]) -> ZootopiaMessage:
         """Handle an incoming message from a Bird SMS sender."""
         try:
-            print(request_body['payload'])
+            if isinstance(request_body, (bytes, str)):
+                request_body = orjson.loads(request_body)
             bird_message = request_body['payload']
-        except ValidationError as e:
-            print(f"Error parsing Bird message data: {e}")
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            logger.error(f"Error parsing Bird message data: {e}")
             raise MessageParsingError("Invalid Bird message format.") from e
 
         try:
             phone_number = bird_message['sender']['contact']['identifierValue']
             channel_id = bird_message['channelId']
-            self._user_phone =phone_number
-            self._channel_id = channel_id
             message_text = bird_message['body']['text']['text']
 
             metadata = BirdMetadata(
@@ -82,26 +91,30 @@ class BirdSMSProvider(MessageProviderBase):
                 provider=MessageProvider.BIRD,
                 type=message_type,
             )
-        except KeyError as e:
-            print(f"Error extracting data from Bird message: {e}")
+        except (KeyError, TypeError, ValidationError) as e:
+            logger.error(f"Error extracting data from Bird message: {e}")
             raise MessageParsingError(f"Missing key in Bird message: {e}") from e
     
     # TODO: Get verification that message was actually sent
-    async def send_message(self, message: str) -> bool:
-        """Send a Bird SMS message to the recipient."""
+    async def send_message(self, message: str, user_id: str) -> bool:
+        """Send a Bird SMS message to the recipient (phone number)."""
         try:
             url = f"{self._api_url}/workspaces/{self._workspace_id}/channels/{self._channel_id}/messages"
             payload = {
                 "receiver": {
-                    "contacts": [{"identifierValue": self._user_phone}]
+                    "contacts": [{"identifierValue": user_id}]
                 },
                 "body": {"type": "text", "text": {"text": message}},
             }
 
-            requests.post(url, headers=self._api_header, json=payload)
+            await self._client.post(url, json=payload)
         except Exception as e:
             raise SendMessageError(f"Error sending message: {e}") from e
 
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP client."""
+        await self._client.aclose()
+
     async def register_webhook(self, event: str, webhook_url: str) -> None:
         """Register a webhook URL for receiving text events from Bird API."""
         url = (
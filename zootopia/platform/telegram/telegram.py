@@ -1,11 +1,13 @@
 """Messaging class utilizing Telegram Bot"""
 
+import asyncio
 import io
-import json
 import os
-from typing import Optional, Union, cast
+import time
+from typing import AsyncIterator, List, Optional, Union, cast
 
 import aiohttp
+import orjson
 import telegram
 from pydantic import ValidationError
 from config.config import TelegramConfig
@@ -24,34 +26,33 @@ from zootopia.core.logger import logger
 
 
 class Telegram(MessageProviderBase):
-    def __init__(self, token: str):
+    # Longest text of one Telegram message
+    MAX_MESSAGE_LENGTH = 4096
+
+    def __init__(self, token: str, stream_edit_interval: float = 1.0):
         """Initialize the Telegram Bot messaging service."""
         self._bot = telegram.Bot(token=token)
-        self._user_id = None
+        self._stream_edit_interval = stream_edit_interval
 
     @classmethod
     def from_config(cls, config: TelegramConfig) -> "Telegram":
         """Instantiate and return a Telegram object."""
         token = config.TELEGRAM_BOT_TOKEN
-        return cls(token)
+        return cls(token, stream_edit_interval=config.STREAM_EDIT_INTERVAL_SECONDS)
 
     @classmethod
     def receive_message(cls, request_body) -> ZootopiaMessage:
         """Handle an incoming message from a Telegram sender."""
         try:
-            # Parse request body
-            if isinstance(request_body, str):
-                request_body = json.loads(request_body.replace('"from"', '"from_'))
-            elif isinstance(request_body, dict):
-                # If it's already a dict, just replace the 'from' key
-                if 'from' in request_body:
-                    request_body['from_'] = request_body.pop('from')
-            else:
-                raise ValueError("Unsupported request_body type")
-
-            telegram_message = TelegramMessage(**request_body)
-        except (json.JSONDecodeError, ValidationError) as e:
-            print(f"Error parsing Telegram message data: {e}")
+            # Parse request body ('from' is mapped by the model's alias)
+            if isinstance(request_body, (bytes, str)):
+                request_body = orjson.loads(request_body)
+            elif not isinstance(request_body, dict):
+                raise MessageParsingError("Unsupported request_body type")
+
+            telegram_message = TelegramMessage.model_validate(request_body)
+        except (orjson.JSONDecodeError, ValidationError) as e:
+            logger.error(f"Error parsing Telegram message data: {e}")
             raise MessageParsingError("Invalid Telegram message format.") from e
 
         try:
@@ -69,11 +70,9 @@ class Telegram(MessageProviderBase):
             metadata = TelegramMetadata(
                 uid=telegram_message.message.from_.id,
                 user_name=user_name,
-                chat_id=telegram_message.message.chat.id
+                chat_id=str(telegram_message.message.chat.id)
             )
 
-            cls._user_id = telegram_message.message.from_.id
-
             return ZootopiaMessage(
                 content=telegram_message,
                 metadata=metadata,
@@ -81,7 +80,7 @@ class Telegram(MessageProviderBase):
                 type=message_type,
             )
         except AttributeError as e:
-            print(f"Error extracting data from Telegram message: {e}")
+            logger.error(f"Error extracting data from Telegram message: {e}")
             raise MessageParsingError(f"Missing attribute in Telegram message: {e}") from e
 
     async def download_file_from_message(
@@ -117,14 +116,81 @@ class Telegram(MessageProviderBase):
             logger.error(f"Error downloading the file: {e}")
             return None
 
-    async def send_message(self, message: str) -> Optional[str]:
-        """Send a message to a Telegram recipient."""
+    async def send_message(self, message: str, user_id: Union[int, str]) -> Optional[str]:
+        """Send a message to a Telegram recipient (chat id)."""
         try:
-            sent_message = await self._bot.send_message(chat_id=self._user_id, text=message)
+            sent_message = await self._bot.send_message(chat_id=user_id, text=message)
             return str(sent_message.message_id)
         except Exception as e:
             raise SendMessageError(f"Error sending message: {e}") from e
 
+    async def send_stream(
+        self, chunks: AsyncIterator[str], user_id: Union[int, str]
+    ) -> Optional[str]:
+        """
+        Send a streamed reply: the first chunk goes out as soon as it arrives, then the
+        message is edited as text comes in, at most once per `stream_edit_interval`.
+        Past MAX_MESSAGE_LENGTH the reply continues in a new message.
+        Returns the id of the last message.
+        """
+        text = ""
+        shown = ""
+        message_id: Optional[str] = None
+        next_edit = 0.0
+
+        async for chunk in chunks:
+            text += chunk
+            while len(text) > self.MAX_MESSAGE_LENGTH:
+                head, text = text[: self.MAX_MESSAGE_LENGTH], text[self.MAX_MESSAGE_LENGTH :]
+                if message_id is None:
+                    await self.send_message(head, user_id)
+                else:
+                    await self._edit_message(head, user_id, message_id)
+                message_id, shown = None, ""
+            if not text.strip():
+                continue
+
+            if message_id is None:
+                message_id = await self.send_message(text, user_id)
+                shown = text
+                next_edit = time.monotonic() + self._stream_edit_interval
+            elif time.monotonic() >= next_edit:
+                retry_after = await self._edit_message(text, user_id, message_id)
+                shown = text if retry_after is None else shown
+                next_edit = time.monotonic() + max(self._stream_edit_interval, retry_after or 0)
+
+        if message_id is None:
+            return await self.send_message(text, user_id) if text.strip() else None
+        if text != shown:
+            retry_after = await self._edit_message(text, user_id, message_id)
+            if retry_after is not None:
+                # The final text must not be lost to the rate limit
+                await asyncio.sleep(retry_after)
+                await self._edit_message(text, user_id, message_id)
+        return message_id
+
+    async def _edit_message(
+        self, text: str, user_id: Union[int, str], message_id: str
+    ) -> Optional[float]:
+        """Replaces the text of a sent message. Returns the wait asked for if rate limited."""
+        try:
+            await self._bot.edit_message_text(
+                text=text, chat_id=user_id, message_id=int(message_id)
+            )
+        except telegram.error.RetryAfter as e:
+            logger.warning(f"Telegram rate limited edits, retry after {e.retry_after}s")
+            # A timedelta in newer python-telegram-bot versions
+            retry_after = e.retry_after
+            if hasattr(retry_after, "total_seconds"):
+                retry_after = retry_after.total_seconds()
+            return float(retry_after)
+        except telegram.error.BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise SendMessageError(f"Error editing message: {e}") from e
+        except Exception as e:
+            raise SendMessageError(f"Error editing message: {e}") from e
+        return None
+
     async def register_webhook(self, webhook_url: str) -> bool:
         """Register a webhook URL for receiving updates from the Telegram Bot API."""
         webhook_info = cast(telegram.WebhookInfo, await self._bot.get_webhook_info())
@@ -136,3 +202,22 @@ class Telegram(MessageProviderBase):
             return True
         except Exception as e:
             raise WebhookError(f"Error registering webhook: {e}") from e
+
+    async def delete_webhook(self) -> bool:
+        """Remove the webhook, which Telegram requires before polling with getUpdates."""
+        try:
+            return await self._bot.delete_webhook()
+        except Exception as e:
+            raise WebhookError(f"Error deleting webhook: {e}") from e
+
+    async def get_updates(
+        self, offset: Optional[int] = None, limit: int = 100, timeout: int = 30
+    ) -> List[dict]:
+        """
+        Long-poll a batch of up to `limit` updates, as webhook-shaped dicts.
+        Passing `offset` confirms every update before it, so they aren't sent again.
+        """
+        updates = await self._bot.get_updates(
+            offset=offset, limit=limit, timeout=timeout, allowed_updates=["message"]
+        )
+        return [update.to_dict() for update in updates]
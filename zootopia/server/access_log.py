@@ -0,0 +1,68 @@
+"""Sampled, structured access log middleware"""
+
+import json
+import random
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from zootopia.core.logger import access_logger
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware that logs one JSON line per sampled request.
+
+    The request body is captured as it streams through to the app (up to
+    `max_body_bytes`), so it is never read twice or buffered in full, and
+    unsampled requests pass through untouched.
+    """
+
+    def __init__(
+        self, app: ASGIApp, sample_rate: float = 1.0, max_body_bytes: int = 1024
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        body = bytearray()
+        entry = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "client": scope["client"][0] if scope.get("client") else None,
+            "status": 500,
+            "request_bytes": 0,
+            "response_bytes": 0,
+        }
+
+        async def receive_and_capture() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                entry["request_bytes"] += len(chunk)
+                remaining = self.max_body_bytes - len(body)
+                if remaining > 0:
+                    body.extend(chunk[:remaining])
+            return message
+
+        async def send_and_capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                entry["status"] = message["status"]
+                entry["ttfb_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            elif message["type"] == "http.response.body":
+                entry["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_capture, send_and_capture)
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            entry["body"] = body.decode("utf-8", errors="replace")
+            entry["body_truncated"] = entry["request_bytes"] > len(body)
+            access_logger.info(json.dumps(entry))
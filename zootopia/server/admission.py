@@ -0,0 +1,74 @@
+"""Admission control: shed inbound messages before they pile up in memory"""
+
+from collections import defaultdict
+from typing import Dict, Optional
+
+from config.config import ZootopiaConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.platform.models import MessageProvider
+
+
+class AdmissionController:
+    """
+    Admits a webhook only while the ingest queue is below `max_queue_depth` and its
+    provider has fewer than its limit of messages in flight (queued or processing).
+    Rejected webhooks get a 503 with Retry-After, which Telegram and Bird retry later.
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: int,
+        max_in_flight: int,
+        max_in_flight_per_provider: Optional[Dict[str, int]] = None,
+        retry_after_seconds: int = 5,
+    ) -> None:
+        self.max_queue_depth = max_queue_depth
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_provider = max_in_flight_per_provider or {}
+        self.retry_after_seconds = retry_after_seconds
+        self._in_flight: Dict[MessageProvider, int] = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, config: ZootopiaConfig) -> "AdmissionController":
+        """Instantiate and return an AdmissionController object."""
+        admission_config = config.SERVER_CONFIG.ADMISSION
+        return cls(
+            max_queue_depth=(
+                admission_config.MAX_QUEUE_DEPTH or config.SERVER_CONFIG.INGEST.QUEUE_SIZE
+            ),
+            max_in_flight=admission_config.MAX_IN_FLIGHT,
+            max_in_flight_per_provider=admission_config.MAX_IN_FLIGHT_PER_PROVIDER,
+            retry_after_seconds=admission_config.RETRY_AFTER_SECONDS,
+        )
+
+    def admit(self, provider: MessageProvider, queue_depth: int) -> Optional[str]:
+        """Returns None and counts the message in flight if admitted, else the reason."""
+        limit = self.max_in_flight_per_provider.get(provider.value, self.max_in_flight)
+
+        if queue_depth >= self.max_queue_depth:
+            reason = "queue_depth"
+        elif self._in_flight[provider] >= limit:
+            reason = "provider_in_flight"
+        else:
+            self._in_flight[provider] += 1
+            metrics.incr("admission.accepted", provider=provider.value)
+            metrics.set_gauge(
+                "admission.in_flight", self._in_flight[provider], provider=provider.value
+            )
+            return None
+
+        self.reject(provider, reason)
+        return reason
+
+    def reject(self, provider: MessageProvider, reason: str) -> None:
+        """Records a shed message."""
+        logger.warning(f"Shedding {provider.value} message: {reason}.")
+        metrics.incr("admission.rejected", provider=provider.value, reason=reason)
+
+    def release(self, provider: MessageProvider) -> None:
+        """Marks an admitted message as done."""
+        self._in_flight[provider] -= 1
+        metrics.set_gauge(
+            "admission.in_flight", self._in_flight[provider], provider=provider.value
+        )
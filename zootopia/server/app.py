@@ -0,0 +1,56 @@
+"""Builds the FastAPI app that receives messages"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI
+
+from config.config import ZootopiaConfig
+from zootopia.core.logger import logger
+from zootopia.core.routers.message import router as message_router
+from zootopia.core.routers.metrics import router as metrics_router
+from zootopia.server.access_log import AccessLogMiddleware
+from zootopia.server.admission import AdmissionController
+from zootopia.server.container import ServiceContainer
+from zootopia.server.dedup import WebhookDeduplicator
+from zootopia.server.ingest import IngestQueue, build_message_handler
+
+
+def create_app(config: ZootopiaConfig, services: Optional[ServiceContainer] = None) -> FastAPI:
+    """
+    Returns the app. `services` replaces the clients built from the config,
+    e.g. to run the load test against fake backends.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Startup
+        logger.info("Starting application.")
+        app.state.deduplicator = WebhookDeduplicator.from_config(config)
+        app.state.admission = AdmissionController.from_config(config)
+        # Clients are built once per worker and shared by every message
+        app.state.services = services or ServiceContainer.from_config(config)
+        await app.state.services.start()
+        app.state.ingest_queue = IngestQueue.from_config(
+            config, handler=build_message_handler(app.state.services)
+        )
+        await app.state.ingest_queue.start()
+        yield
+
+        # Shutdown: finish the messages already acknowledged before exiting
+        logger.info("Closing application, draining in-flight messages.")
+        await app.state.ingest_queue.stop(
+            timeout=config.SERVER_CONFIG.DRAIN_TIMEOUT_SECONDS
+        )
+        await app.state.deduplicator.close()
+        await app.state.services.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=config.SERVER_CONFIG.ACCESS_LOG.SAMPLE_RATE,
+        max_body_bytes=config.SERVER_CONFIG.ACCESS_LOG.MAX_BODY_BYTES,
+    )
+    app.include_router(message_router)
+    app.include_router(metrics_router)
+    return app
@@ -0,0 +1,148 @@
+"""Process-wide clients, built once and shared by every message"""
+
+import asyncio
+import threading
+from typing import Optional, Union
+
+from config.config import ZootopiaConfig
+from zootopia.llm.cache import LLMCache
+from zootopia.llm.llm import LLM, LLMLimits
+from zootopia.llm.router import LLMRouter
+from zootopia.llm.tokens import count_tokens
+from zootopia.platform.registry import ProviderRegistry
+from zootopia.storage.database.cache import CachedDatabase
+from zootopia.storage.database.database import AsyncDatabase, Database, ThreadedDatabase
+from zootopia.storage.database.instrumented import InstrumentedDatabase
+from zootopia.storage.database.recent import RecentMessages
+from zootopia.storage.database.supabase import AsyncSupabaseDB
+from zootopia.storage.database.writer import MessageWriter
+
+
+class ServiceContainer:
+    """
+    Holds the DB client, messaging providers and LLM clients of the process.
+    The app lifespan builds it once and hands it to ContextManager / AgentController,
+    so no connection pool or TLS session is rebuilt per message.
+    """
+
+    def __init__(
+        self,
+        config: ZootopiaConfig,
+        database: AsyncDatabase,
+        providers: ProviderRegistry,
+        intent_llm: LLM,
+        message_writer: MessageWriter,
+        recent_messages: Optional[RecentMessages] = None,
+        llm_limits: Optional[LLMLimits] = None,
+        llm_cache: Optional[LLMCache] = None,
+    ) -> None:
+        self.config = config
+        self.llm_limits = llm_limits
+        self.llm_cache = llm_cache
+        self.database = database
+        self.message_writer = message_writer
+        self.recent_messages = recent_messages
+        self.providers = providers
+        self.intent_llm = intent_llm
+        self._autodb = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: ZootopiaConfig,
+        database: Optional[Union[AsyncDatabase, Database]] = None,
+        llm: Optional[LLM] = None,
+        providers: Optional[ProviderRegistry] = None,
+    ) -> "ServiceContainer":
+        """
+        Instantiate and return a ServiceContainer object.
+        `database`, `llm` and `providers` override the configured backends (e.g. for load tests);
+        a blocking Database is run in worker threads.
+        """
+        if isinstance(database, Database):
+            database = ThreadedDatabase(database)
+        database = database or cls._database_from_config(config)
+        if config.DATABASE_CONFIG.INSTRUMENTATION.ENABLED:
+            # Inside the cache, so only calls that reach the backend are measured
+            database = InstrumentedDatabase.from_config(
+                database, config.DATABASE_CONFIG.INSTRUMENTATION
+            )
+        if config.DATABASE_CONFIG.IDENTITY_CACHE.ENABLED:
+            database = CachedDatabase.from_config(
+                database,
+                config.DATABASE_CONFIG.IDENTITY_CACHE,
+                redis_url=config.BEHAVIORS_CONFIG.ASYNC_CONFIG.REDIS_URL,
+            )
+        llm_limits = LLMLimits.from_config(config.LLM_CONFIG)
+        llm_cache = (
+            LLMCache.from_config(
+                config.LLM_CONFIG.CACHE, redis_url=config.BEHAVIORS_CONFIG.ASYNC_CONFIG.REDIS_URL
+            )
+            if config.LLM_CONFIG.CACHE.ENABLED
+            else None
+        )
+        if llm is None and config.LLM_CONFIG.ROUTER.PROVIDERS:
+            llm = LLMRouter.from_config(config.LLM_CONFIG, limits=llm_limits, cache=llm_cache)
+        return cls(
+            config=config,
+            database=database,
+            providers=providers or ProviderRegistry.from_config(config.MESSAGING_CONFIG),
+            intent_llm=llm
+            or LLM(
+                model=config.BEHAVIORS_CONFIG.INTENT_DETECTION.MODEL,
+                limits=llm_limits,
+                cache=llm_cache,
+            ),
+            llm_limits=llm_limits,
+            llm_cache=llm_cache,
+            message_writer=MessageWriter.from_config(
+                database, config.DATABASE_CONFIG.MESSAGE_WRITER
+            ),
+            recent_messages=(
+                RecentMessages.from_config(
+                    config.DATABASE_CONFIG.RECENT_MESSAGES,
+                    redis_url=config.BEHAVIORS_CONFIG.ASYNC_CONFIG.REDIS_URL,
+                )
+                if config.DATABASE_CONFIG.RECENT_MESSAGES.ENABLED
+                else None
+            ),
+        )
+
+    @staticmethod
+    def _database_from_config(config: ZootopiaConfig) -> AsyncDatabase:
+        if config.DATABASE_CONFIG.BACKEND == "sqlite":
+            from zootopia.storage.database.sqlite import SQLiteDB
+
+            return ThreadedDatabase(SQLiteDB.from_config(config.DATABASE_CONFIG.SQLITE))
+        return AsyncSupabaseDB.from_config(config.DATABASE_CONFIG.SUPABASE)
+
+    @property
+    def autodb(self):
+        """AutoDB, built on first use since it loads its own config and LLMs."""
+        if self._autodb is None:
+            with self._lock:
+                if self._autodb is None:
+                    from config.config import get_autodb_config
+                    from zootopia.controller.memory.autodb.autodb import AutoDB
+
+                    self._autodb = AutoDB.from_config(get_autodb_config())
+        return self._autodb
+
+    async def start(self) -> None:
+        """Starts background work (batched message writes) and loads the tokenizer."""
+        await self.message_writer.start()
+        # tiktoken may download its encoding on first use: do it off the event loop
+        await asyncio.to_thread(count_tokens, "", self.intent_llm.model)
+
+    async def aclose(self) -> None:
+        """Writes buffered messages, then closes pooled connections."""
+        await self.message_writer.aclose()
+        if self.recent_messages is not None:
+            await self.recent_messages.aclose()
+        if self.llm_limits is not None:
+            await self.llm_limits.aclose()
+        if self.llm_cache is not None:
+            await self.llm_cache.aclose()
+        await self.providers.aclose()
+        await self.database.aclose()
@@ -0,0 +1,97 @@
+"""Drops webhook redeliveries before they reach the ingest queue"""
+
+from typing import Optional
+
+from cachetools import TTLCache
+
+from config.config import ZootopiaConfig
+from zootopia.core.logger import logger
+
+
+class WebhookDeduplicator:
+    """
+    Remembers the delivery ids of recent webhooks (Telegram `update_id`, Bird payload id).
+
+    An in-process bounded LRU with TTL catches retries that hit the same worker,
+    and an optional Redis tier (SET NX EX) catches them across workers and hosts.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: int = 3600,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._seen: TTLCache = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        self._redis = None
+        if redis_url:
+            from redis import asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+    @classmethod
+    def from_config(cls, config: ZootopiaConfig) -> "WebhookDeduplicator":
+        """Instantiate and return a WebhookDeduplicator object."""
+        dedup_config = config.SERVER_CONFIG.DEDUP
+        return cls(
+            max_size=dedup_config.MAX_SIZE,
+            ttl_seconds=dedup_config.TTL_SECONDS,
+            redis_url=(
+                config.BEHAVIORS_CONFIG.ASYNC_CONFIG.REDIS_URL
+                if dedup_config.USE_REDIS
+                else None
+            ),
+        )
+
+    @staticmethod
+    def delivery_key(request_body: dict) -> Optional[str]:
+        """Returns the provider's unique delivery id of a webhook body, if any."""
+        try:
+            if "update_id" in request_body:
+                return f"telegram:{request_body['update_id']}"
+            if "payload" in request_body:
+                return f"bird:{request_body['payload']['id']}"
+        except (KeyError, TypeError):
+            pass
+        return None
+
+    async def is_duplicate(self, request_body: dict) -> bool:
+        """Returns True if this delivery was already seen, otherwise records it."""
+        key = self.delivery_key(request_body)
+        if key is None:
+            return False
+
+        if key in self._seen:
+            return True
+        self._seen[key] = True
+
+        if self._redis is not None:
+            try:
+                is_new = await self._redis.set(
+                    f"webhook:{key}", 1, nx=True, ex=self._ttl_seconds
+                )
+                return not is_new
+            except Exception as e:
+                # Fail open: processing a duplicate beats dropping a message
+                logger.error(f"Error checking webhook delivery in Redis: {e}")
+
+        return False
+
+    async def forget(self, request_body: dict) -> None:
+        """Forgets a delivery so the provider's retry is accepted (e.g. after a 503)."""
+        key = self.delivery_key(request_body)
+        if key is None:
+            return
+
+        self._seen.pop(key, None)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(f"webhook:{key}")
+            except Exception as e:
+                logger.error(f"Error forgetting webhook delivery in Redis: {e}")
+
+    async def close(self) -> None:
+        """Closes the Redis connection, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
@@ -0,0 +1,104 @@
+"""Per-room ordered executor: serial within a room, parallel across rooms"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+from zootopia.core.logger import logger
+
+T = TypeVar("T")
+
+
+class RoomExecutor(Generic[T]):
+    """
+    Actor-style scheduler keyed by room.
+
+    Every room gets a FIFO mailbox. A room is scheduled on the ready queue at most
+    once at a time, so only one worker ever runs a given room's items and they run
+    in arrival order, while different rooms are spread over the whole worker pool.
+    A room is requeued after each item, giving round-robin fairness between busy rooms.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable[None]],
+        num_workers: int = 8,
+        max_pending: int = 1000,
+    ) -> None:
+        self._handler = handler
+        self._num_workers = num_workers
+        self._max_pending = max_pending
+        self._mailboxes: Dict[str, Deque[T]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of items queued or running across all rooms."""
+        return self._pending
+
+    @property
+    def active_rooms(self) -> int:
+        """Number of rooms with queued or running items."""
+        return len(self._mailboxes)
+
+    def submit(self, room_key: str, item: T) -> bool:
+        """Append an item to the room's mailbox. Returns False if the executor is full."""
+        if self._pending >= self._max_pending:
+            return False
+
+        mailbox = self._mailboxes.get(room_key)
+        if mailbox is None:
+            # Room is idle: create its mailbox and schedule it
+            self._mailboxes[room_key] = deque([item])
+            self._ready.put_nowait(room_key)
+        else:
+            # Room is already scheduled or running, its worker will pick this up
+            mailbox.append(item)
+
+        self._pending += 1
+        self._idle.clear()
+        return True
+
+    async def start(self) -> None:
+        """Spawn the worker pool."""
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"room-worker-{i}")
+            for i in range(self._num_workers)
+        ]
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted item is processed. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self) -> None:
+        """Cancel the worker pool. Items still queued are discarded."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            room_key = await self._ready.get()
+            mailbox = self._mailboxes[room_key]
+            item = mailbox.popleft()
+            try:
+                await self._handler(item)
+            except Exception as e:
+                logger.error(f"Room worker {index} failed on {room_key}: {e}")
+            finally:
+                self._pending -= 1
+                if mailbox:
+                    self._ready.put_nowait(room_key)
+                else:
+                    del self._mailboxes[room_key]
+                if self._pending == 0:
+                    self._idle.set()
@@ -0,0 +1,141 @@
+"""Background queue that decouples webhook acks from message processing"""
+
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from config.config import ZootopiaConfig
+from zootopia.controller import AgentController, ContextManager
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.server.container import ServiceContainer
+from zootopia.server.executor import RoomExecutor
+
+MessageHandler = Callable[[dict], Awaitable[None]]
+_Item = Tuple[float, dict, Optional[Callable[[], None]]]
+
+
+def build_message_handler(services: ServiceContainer) -> MessageHandler:
+    """Returns the default handler: resolve the context and run the controller."""
+
+    async def handle(request_body: dict) -> None:
+        with metrics.timer("pipeline.context"):
+            context = await ContextManager.create(
+                request_body,
+                services.config,
+                database=services.database,
+                providers=services.providers,
+            )
+        logger.info(
+            f"Processing ({context.message.provider.value}) message: {context.message}"
+        )
+        zootopian = AgentController(
+            context,
+            llm=services.intent_llm,
+            message_writer=services.message_writer,
+            recent_messages=services.recent_messages,
+        )
+        with metrics.timer("pipeline.controller"):
+            await zootopian.handle_message()
+
+    return handle
+
+
+def room_key(request_body: dict) -> str:
+    """
+    Returns the room key of a raw webhook body, without any DB lookup.
+
+    A room is a (user, agent) pair, so the key is built from the same ids
+    ContextManager uses to resolve the user and agent of the message.
+    """
+    try:
+        if "update_id" in request_body:
+            message = request_body.get("message") or {}
+            sender = message.get("from") or message.get("chat") or {}
+            return f"room:telegram:{sender['id']}"
+        if "payload" in request_body:
+            payload = request_body["payload"]
+            phone_number = payload["sender"]["contact"]["identifierValue"]
+            return f"room:bird:{payload['channelId']}:{phone_number}"
+    except (AttributeError, KeyError, TypeError):
+        pass
+
+    # Malformed bodies fail parsing anyway, let them share one mailbox
+    return "room:unknown"
+
+
+class IngestQueue:
+    """
+    Bounded queue of webhook bodies drained by a pool of asyncio workers.
+    The webhook only enqueues, so its latency no longer depends on the LLM or DB.
+    Messages of the same room are processed one at a time, in arrival order.
+    """
+
+    def __init__(
+        self,
+        handler: MessageHandler,
+        num_workers: int = 8,
+        max_size: int = 1000,
+    ) -> None:
+        self._max_size = max_size
+        self._closed = False
+        self._handler = handler
+        self._executor: RoomExecutor[_Item] = RoomExecutor(
+            self._run, num_workers=num_workers, max_pending=max_size
+        )
+
+    @classmethod
+    def from_config(cls, config: ZootopiaConfig, handler: MessageHandler) -> "IngestQueue":
+        """Instantiate and return an IngestQueue object."""
+        ingest_config = config.SERVER_CONFIG.INGEST
+        return cls(
+            handler=handler,
+            num_workers=ingest_config.NUM_WORKERS,
+            max_size=ingest_config.QUEUE_SIZE,
+        )
+
+    @property
+    def depth(self) -> int:
+        """Number of messages queued or being processed."""
+        return self._executor.pending
+
+    def submit(
+        self, request_body: dict, on_done: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        Enqueue a webhook body without waiting. Returns False if the queue is full.
+        `on_done` is called once the message is processed, successfully or not.
+        """
+        if self._closed:
+            logger.warning("Ingest queue is draining, rejecting message.")
+            return False
+        item = (time.perf_counter(), request_body, on_done)
+        if not self._executor.submit(room_key(request_body), item):
+            logger.warning(f"Ingest queue full ({self._max_size}), rejecting message.")
+            return False
+        return True
+
+    async def start(self) -> None:
+        """Spawn the worker pool."""
+        await self._executor.start()
+        metrics.register_gauge("ingest.depth", lambda: self.depth)
+        metrics.register_gauge("ingest.active_rooms", lambda: self._executor.active_rooms)
+        logger.info("Started ingest workers.")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued messages to finish (up to `timeout`), then stop the workers."""
+        self._closed = True
+        if not await self._executor.drain(timeout):
+            logger.warning(
+                f"Ingest queue did not drain in {timeout}s, dropping {self.depth} messages."
+            )
+        await self._executor.stop()
+
+    async def _run(self, item: _Item) -> None:
+        enqueued_at, request_body, on_done = item
+        metrics.observe("pipeline.queue_wait", time.perf_counter() - enqueued_at)
+        try:
+            await self._handler(request_body)
+        finally:
+            metrics.observe("pipeline.total", time.perf_counter() - enqueued_at)
+            if on_done is not None:
+                on_done()
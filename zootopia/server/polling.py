@@ -0,0 +1,161 @@
+"""Telegram long-polling ingest, for hosts that can't expose a public webhook"""
+
+import asyncio
+import os
+from typing import List, Optional
+
+from config.config import ZootopiaConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.platform.telegram.telegram import Telegram
+from zootopia.server.ingest import IngestQueue
+
+
+class OffsetCheckpoint:
+    """
+    Persists the next getUpdates offset, so a restart resumes after the last
+    enqueued update. Stored in Redis if `redis_url` is set, else in a local file.
+    """
+
+    REDIS_KEY = "telegram:offset"
+
+    def __init__(self, path: str, redis_url: Optional[str] = None) -> None:
+        self._path = path
+        self._redis = None
+        if redis_url:
+            from redis import asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+    async def load(self) -> Optional[int]:
+        """Returns the saved offset, or None on first run."""
+        if self._redis is not None:
+            value = await self._redis.get(self.REDIS_KEY)
+            return int(value) if value is not None else None
+        return await asyncio.to_thread(self._read_file)
+
+    async def save(self, offset: int) -> None:
+        """Saves the offset of the next update to fetch."""
+        if self._redis is not None:
+            await self._redis.set(self.REDIS_KEY, offset)
+        else:
+            await asyncio.to_thread(self._write_file, offset)
+
+    async def close(self) -> None:
+        """Closes the Redis connection, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def _read_file(self) -> Optional[int]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as offset_file:
+                return int(offset_file.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_file(self, offset: int) -> None:
+        # Write then rename, so a crash never leaves a truncated offset behind
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as offset_file:
+            offset_file.write(str(offset))
+        os.replace(temp_path, self._path)
+
+
+class TelegramPoller:
+    """
+    Pulls Telegram updates in batches with long polling and feeds them to the
+    same ingest queue as the webhook. When the queue is full it stops pulling
+    instead of dropping updates, and the offset is checkpointed once a batch
+    is enqueued (the same point the webhook acknowledges at).
+    """
+
+    def __init__(
+        self,
+        telegram: Telegram,
+        ingest_queue: IngestQueue,
+        checkpoint: OffsetCheckpoint,
+        batch_size: int = 100,
+        timeout: int = 30,
+        retry_seconds: float = 1.0,
+    ) -> None:
+        self._telegram = telegram
+        self._ingest_queue = ingest_queue
+        self._checkpoint = checkpoint
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._retry_seconds = retry_seconds
+        self._stopping = asyncio.Event()
+
+    @classmethod
+    def from_config(cls, config: ZootopiaConfig, ingest_queue: IngestQueue) -> "TelegramPoller":
+        """Instantiate and return a TelegramPoller object."""
+        polling_config = config.SERVER_CONFIG.POLLING
+        checkpoint = OffsetCheckpoint(
+            polling_config.OFFSET_FILE,
+            redis_url=(
+                config.BEHAVIORS_CONFIG.ASYNC_CONFIG.REDIS_URL
+                if polling_config.USE_REDIS
+                else None
+            ),
+        )
+        return cls(
+            telegram=Telegram.from_config(config.MESSAGING_CONFIG.TELEGRAM),
+            ingest_queue=ingest_queue,
+            checkpoint=checkpoint,
+            batch_size=polling_config.BATCH_SIZE,
+            timeout=polling_config.TIMEOUT_SECONDS,
+        )
+
+    def stop(self) -> None:
+        """Asks `run` to return after the batch in progress is enqueued."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Polls until `stop` is called."""
+        await self._telegram.delete_webhook()
+        offset = await self._checkpoint.load()
+        logger.info(f"Polling Telegram updates from offset {offset}.")
+
+        try:
+            while not self._stopping.is_set():
+                updates = await self._fetch(offset)
+                if not updates:
+                    continue
+
+                await self._enqueue(updates)
+                offset = updates[-1]["update_id"] + 1
+                await self._checkpoint.save(offset)
+        finally:
+            await self._checkpoint.close()
+        logger.info(f"Stopped polling Telegram updates at offset {offset}.")
+
+    async def _fetch(self, offset: Optional[int]) -> List[dict]:
+        """Long-polls one batch, returning early (and empty) if stopped."""
+        fetch = asyncio.ensure_future(
+            self._telegram.get_updates(offset, limit=self._batch_size, timeout=self._timeout)
+        )
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        with metrics.timer("polling.get_updates"):
+            await asyncio.wait({fetch, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+        if not fetch.done():
+            # Updates are only confirmed by the next offset, so nothing is lost
+            fetch.cancel()
+            return []
+        try:
+            updates = fetch.result()
+        except Exception as e:
+            logger.error(f"Error polling Telegram updates: {e}")
+            await asyncio.sleep(self._retry_seconds)
+            return []
+
+        metrics.incr("polling.updates", len(updates))
+        return updates
+
+    async def _enqueue(self, updates: List[dict]) -> None:
+        """Submits every update, waiting for room in the queue rather than dropping."""
+        for update in updates:
+            while not self._ingest_queue.submit(update):
+                metrics.incr("polling.backpressure")
+                await asyncio.sleep(self._retry_seconds)
@@ -1,8 +1,8 @@
 """Cancels the 1st message task if it's ongoing and a 2nd message comes in"""
 
 import uuid
-import aioredis
-from aioredis import Redis
+from redis import asyncio as redis
+from redis.asyncio import Redis
 from zootopia.core.logger import logger
 
 # Temp: To use
@@ -15,7 +15,7 @@ from zootopia.core.logger import logger
 # TODO: get redis url from config
 class TaskManager:
     def __init__(self, room_id):
-        self.client: Redis = aioredis.from_url("redis://127.0.0.1")   
+        self.client: Redis = redis.from_url("redis://127.0.0.1")   
         self.room_id: int = room_id 
         self.task_id: str = None
 
@@ -30,6 +30,6 @@ class TaskManager:
         latest_task_id = await self.client.get(
             f"room:{self.room_id}:task_id"
         )
-        logger.info(f"This process' task id: {self.task_id}. 
-                    Most recent process' task id: {latest_task_id.decode()}")
+        logger.info(f"This process' task id: {self.task_id}. "
+                    f"Most recent process' task id: {latest_task_id.decode()}")
         return self.task_id == latest_task_id.decode()
@@ -0,0 +1,301 @@
+"""Read-through identity cache in front of an AsyncDatabase"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from config.config import IdentityCacheConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.core.schema import (
+    AgentTableModel,
+    RoomTableModel,
+    TableModel,
+    Tables,
+    UserTableModel,
+)
+from zootopia.storage.database.database import AsyncDatabase, Identity, identity_conditions
+
+# Columns an identity entry is indexed by, so a write filtering on them evicts it
+_INDEXED_COLUMNS = {
+    Tables.USERS.value: (
+        Tables.USERS__id.value,
+        Tables.USERS__telegram_uid.value,
+        Tables.USERS__phone_number.value,
+    ),
+    Tables.AGENTS.value: (Tables.AGENTS__id.value, Tables.AGENTS__bird_channel_id.value),
+    Tables.ROOMS.value: (
+        Tables.ROOMS__id.value,
+        Tables.ROOMS__user_id.value,
+        Tables.ROOMS__agent_id.value,
+    ),
+}
+
+
+def _tag(table_name: str, column: str, value) -> str:
+    return f"{table_name}:{column}={value}"
+
+
+def _tags_of(table_name: str, row: TableModel) -> List[str]:
+    return [
+        _tag(table_name, column, getattr(row, column))
+        for column in _INDEXED_COLUMNS[table_name]
+        if getattr(row, column, None) is not None
+    ]
+
+
+class CachedDatabase(AsyncDatabase):
+    """
+    Caches `resolve_identity` (user, agent & room of a sender), which rarely changes
+    but runs on every message. An in-process TTL/LRU tier answers most lookups and
+    an optional Redis tier shares entries between workers.
+
+    Inserts, updates and deletes on users, agents and rooms evict the entries whose
+    rows match the write; a write filtering on other columns clears the cache.
+    Every other call goes straight to the wrapped database.
+    """
+
+    KEY_PREFIX = "identity"
+
+    def __init__(
+        self,
+        database: AsyncDatabase,
+        max_size: int = 10000,
+        ttl_seconds: int = 300,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.database = database
+        self._ttl_seconds = ttl_seconds
+        self._entries: TTLCache = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        # tag -> keys of the entries containing that row; same TTL as the entries
+        self._index: TTLCache = TTLCache(maxsize=max_size * 8, ttl=ttl_seconds)
+        self._redis = None
+        if redis_url:
+            from redis import asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+    @classmethod
+    def from_config(
+        cls,
+        database: AsyncDatabase,
+        config: IdentityCacheConfig,
+        redis_url: Optional[str] = None,
+    ) -> "CachedDatabase":
+        """Instantiate and return a CachedDatabase object."""
+        return cls(
+            database,
+            max_size=config.MAX_SIZE,
+            ttl_seconds=config.TTL_SECONDS,
+            redis_url=redis_url if config.USE_REDIS else None,
+        )
+
+    async def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        key = self._key(user, agent)
+
+        identity = self._entries.get(key)
+        if identity is not None:
+            metrics.incr("db.identity_cache", result="hit", tier="local")
+            return identity
+
+        identity = await self._redis_get(key)
+        if identity is not None:
+            metrics.incr("db.identity_cache", result="hit", tier="redis")
+            self._store_local(key, identity)
+            return identity
+
+        metrics.incr("db.identity_cache", result="miss")
+        identity = await self.database.resolve_identity(user, agent)
+        self._store_local(key, identity)
+        await self._redis_set(key, identity)
+        return identity
+
+    async def insert(self, table_name: str, item: TableModel) -> TableModel:
+        row = await self.database.insert(table_name, item)
+        if table_name in _INDEXED_COLUMNS:
+            await self._invalidate(table_name, _tags_of(table_name, row or item))
+        return row
+
+    async def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        rows = await self.database.bulk_insert(table_name, items)
+        if table_name in _INDEXED_COLUMNS:
+            await self._invalidate(
+                table_name, [tag for row in rows for tag in _tags_of(table_name, row)]
+            )
+        return rows
+
+    async def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        row = await self.database.update(table_name, item, *conditions)
+        if table_name in _INDEXED_COLUMNS:
+            await self._invalidate_conditions(table_name, conditions, row)
+        return row
+
+    async def delete(self, table_name: str, *conditions) -> bool:
+        deleted = await self.database.delete(table_name, *conditions)
+        if table_name in _INDEXED_COLUMNS:
+            await self._invalidate_conditions(table_name, conditions)
+        return deleted
+
+    async def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        return await self.database.get_row(
+            table_name, *conditions, columns=columns, trusted=trusted
+        )
+
+    async def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        return await self.database.get_multiple_rows(
+            table_name,
+            *conditions,
+            max_rows=max_rows,
+            from_time=from_time,
+            order_by=order_by,
+            order_desc=order_desc,
+            columns=columns,
+            trusted=trusted,
+        )
+
+    async def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        return await self.database.query(table_name, *conditions, limit=limit)
+
+    async def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        return await self.database.get_page(
+            table_name, *conditions, after=after, page_size=page_size, order_desc=order_desc
+        )
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+        await self.database.aclose()
+
+    def _key(self, user: UserTableModel, agent: AgentTableModel) -> str:
+        user_conditions, agent_conditions = identity_conditions(user, agent)
+        lookup = ",".join(f"{column}={value}" for column, value in user_conditions)
+        lookup += "|" + ",".join(f"{column}={value}" for column, value in agent_conditions)
+        return f"{self.KEY_PREFIX}:{lookup}"
+
+    def _store_local(self, key: str, identity: Identity) -> None:
+        self._entries[key] = identity
+        for tag in self._identity_tags(identity):
+            keys = self._index.get(tag) or set()
+            keys.add(key)
+            self._index[tag] = keys
+
+    @staticmethod
+    def _identity_tags(identity: Identity) -> List[str]:
+        user, agent, room = identity
+        return (
+            _tags_of(Tables.USERS.value, user)
+            + _tags_of(Tables.AGENTS.value, agent)
+            + _tags_of(Tables.ROOMS.value, room)
+        )
+
+    async def _invalidate_conditions(
+        self, table_name: str, conditions: Iterable[Tuple], row: Optional[TableModel] = None
+    ) -> None:
+        conditions = list(conditions)
+        if not conditions or any(
+            column not in _INDEXED_COLUMNS[table_name] for column, _ in conditions
+        ):
+            await self.clear()
+            return
+        tags = [_tag(table_name, column, value) for column, value in conditions]
+        if row is not None:
+            tags += _tags_of(table_name, row)
+        await self._invalidate(table_name, tags)
+
+    async def _invalidate(self, table_name: str, tags: List[str]) -> None:
+        keys: Set[str] = set()
+        for tag in tags:
+            keys |= self._index.pop(tag, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        if keys:
+            metrics.incr("db.identity_cache.evictions", len(keys), table=table_name)
+
+        if self._redis is not None:
+            try:
+                tag_keys = [f"{self.KEY_PREFIX}:tag:{tag}" for tag in tags]
+                members = set()
+                for tag_key in tag_keys:
+                    members |= {member.decode() for member in await self._redis.smembers(tag_key)}
+                await self._redis.delete(*tag_keys, *members)
+            except Exception as e:
+                logger.error(f"Error invalidating identity cache in Redis: {e}")
+
+    async def clear(self) -> None:
+        """Forgets every cached identity."""
+        self._entries.clear()
+        self._index.clear()
+        if self._redis is not None:
+            try:
+                keys = [key async for key in self._redis.scan_iter(f"{self.KEY_PREFIX}:*")]
+                if keys:
+                    await self._redis.delete(*keys)
+            except Exception as e:
+                logger.error(f"Error clearing identity cache in Redis: {e}")
+
+    async def _redis_get(self, key: str) -> Optional[Identity]:
+        if self._redis is None:
+            return None
+        try:
+            value = await self._redis.get(key)
+        except Exception as e:
+            # Fail open: a miss only costs a DB round trip
+            logger.error(f"Error reading identity cache from Redis: {e}")
+            return None
+        if value is None:
+            return None
+        data = orjson.loads(value)
+        return (
+            UserTableModel(**data["user"]),
+            AgentTableModel(**data["agent"]),
+            RoomTableModel(**data["room"]),
+        )
+
+    async def _redis_set(self, key: str, identity: Identity) -> None:
+        if self._redis is None:
+            return
+        user, agent, room = identity
+        value = orjson.dumps(
+            {
+                "user": user.model_dump(mode="json"),
+                "agent": agent.model_dump(mode="json"),
+                "room": room.model_dump(mode="json"),
+            }
+        )
+        try:
+            pipeline = self._redis.pipeline()
+            pipeline.set(key, value, ex=self._ttl_seconds)
+            for tag in self._identity_tags(identity):
+                tag_key = f"{self.KEY_PREFIX}:tag:{tag}"
+                pipeline.sadd(tag_key, key)
+                pipeline.expire(tag_key, self._ttl_seconds)
+            await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error writing identity cache to Redis: {e}")
@@ -1,8 +1,54 @@
+import asyncio
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from zootopia.core.schema import (
+    AgentTableModel,
+    RoomTableModel,
+    TableModel,
+    Tables,
+    UserTableModel,
+)
+from zootopia.core.schema.table import TABLE_MODEL_MAP
+
+Identity = Tuple[UserTableModel, AgentTableModel, RoomTableModel]
+
+
+def identity_conditions(user: UserTableModel, agent: AgentTableModel):
+    """Returns the lookup conditions of a user and an agent, from their unique keys."""
+    if user.telegram_uid is not None:
+        user_conditions = [(Tables.USERS__telegram_uid.value, user.telegram_uid)]
+    else:
+        user_conditions = [(Tables.USERS__phone_number.value, user.phone_number)]
+
+    # Telegram messages all go to the one bot agent, i.e. the first agent row
+    agent_conditions = []
+    if agent.bird_channel_id is not None:
+        agent_conditions = [(Tables.AGENTS__bird_channel_id.value, agent.bird_channel_id)]
+
+    return user_conditions, agent_conditions
+
+
+def keyset_columns(table_name: str) -> Tuple[str, ...]:
+    """Columns rows are paginated by: (created_at, id), or id if the table has no created_at."""
+    if "created_at" in TABLE_MODEL_MAP[table_name].model_fields:
+        return ("created_at", "id")
+    return ("id",)
+
+
+def decode_rows(
+    table_name: str, rows: Iterable[dict], trusted: bool = False
+) -> List[TableModel]:
+    """
+    Builds the models of a table's rows. Trusted rows, read back from our own
+    database, skip pydantic validation: values keep their wire types (e.g.
+    created_at stays a string) and columns not selected keep their defaults.
+    """
+    model_class = TABLE_MODEL_MAP[table_name]
+    build = model_class.model_construct if trusted else model_class
+    return [build(**row) for row in rows]
 
-from zootopia.core.schema import TableModel
 
 class Database(ABC):
     @abstractmethod
@@ -14,19 +60,30 @@ class Database(ABC):
         pass
 
     @abstractmethod
-    def get_row(self, table_name: str, *conditions) -> Optional[TableModel]:
+    def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        """
+        Returns the first matching row. `columns` selects only those columns and
+        `trusted` skips validation (see decode_rows); both are for hot reads.
+        """
         pass
 
     @abstractmethod
-
     def get_multiple_rows(
         self,
         table_name: str,
+        *conditions,
         max_rows: int = 10,
         from_time: Optional[datetime] = None,
         order_by: str = "created_at",
         order_desc: bool = True,
-        *conditions
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
     ) -> List[TableModel]:
         pass
 
@@ -35,5 +92,253 @@ class Database(ABC):
         pass
 
     @abstractmethod
-    def query(self, table_name: str, *conditions) -> List[TableModel]:
+    def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        pass
+
+    @abstractmethod
+    def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        """Returns the next `page_size` rows after the row `after`, in keyset_columns order."""
+        pass
+
+    def iter_rows(
+        self,
+        table_name: str,
+        *conditions,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> Iterator[TableModel]:
+        """
+        Yields every matching row, fetching `page_size` rows at a time with keyset
+        pagination, so memory stays bounded and rows inserted meanwhile aren't skipped.
+        """
+        after = None
+        while True:
+            page = self.get_page(
+                table_name, *conditions, after=after, page_size=page_size, order_desc=order_desc
+            )
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]
+
+    def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        """Inserts many rows of one table; backends override this to use one request."""
+        return [self.insert(table_name, item) for item in items]
+
+    def close(self) -> None:
+        """Releases connections, if any."""
+
+    def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        """
+        Gets or creates the user, the agent and their room in one call.
+        `user` and `agent` are the rows to create if none match their unique keys.
+        Backends with server-side logic override this to do it in one round trip.
+        """
+        user_conditions, agent_conditions = identity_conditions(user, agent)
+        user = self.get_row(Tables.USERS.value, *user_conditions) or self.insert(
+            Tables.USERS.value, user
+        )
+        agent = self.get_row(Tables.AGENTS.value, *agent_conditions) or self.insert(
+            Tables.AGENTS.value, agent
+        )
+        room_conditions = [
+            (Tables.ROOMS__user_id.value, user.id),
+            (Tables.ROOMS__agent_id.value, agent.id),
+        ]
+        room = self.get_row(Tables.ROOMS.value, *room_conditions) or self.insert(
+            Tables.ROOMS.value, RoomTableModel(user_id=user.id, agent_id=agent.id)
+        )
+        return user, agent, room
+
+
+class AsyncDatabase(ABC):
+    """Same operations as Database, awaitable so they don't block the event loop."""
+
+    @abstractmethod
+    async def insert(self, table_name: str, item: TableModel) -> TableModel:
+        pass
+
+    @abstractmethod
+    async def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        pass
+
+    @abstractmethod
+    async def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        pass
+
+    @abstractmethod
+    async def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        pass
+
+    @abstractmethod
+    async def delete(self, table_name: str, *conditions) -> bool:
+        pass
+
+    @abstractmethod
+    async def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        pass
+
+    @abstractmethod
+    async def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        """Returns the next `page_size` rows after the row `after`, in keyset_columns order."""
         pass
+
+    async def iter_rows(
+        self,
+        table_name: str,
+        *conditions,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> AsyncIterator[TableModel]:
+        """Async Database.iter_rows: `async for row in database.iter_rows(...)`."""
+        after = None
+        while True:
+            page = await self.get_page(
+                table_name, *conditions, after=after, page_size=page_size, order_desc=order_desc
+            )
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            after = page[-1]
+
+    async def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        """Inserts many rows of one table; backends override this to use one request."""
+        return [await self.insert(table_name, item) for item in items]
+
+    async def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        """Async Database.resolve_identity; user and agent are looked up concurrently."""
+        user_conditions, agent_conditions = identity_conditions(user, agent)
+
+        async def get_or_create(table_name: str, item: TableModel, conditions):
+            row = await self.get_row(table_name, *conditions)
+            return row or await self.insert(table_name, item)
+
+        user, agent = await asyncio.gather(
+            get_or_create(Tables.USERS.value, user, user_conditions),
+            get_or_create(Tables.AGENTS.value, agent, agent_conditions),
+        )
+        room = await get_or_create(
+            Tables.ROOMS.value,
+            RoomTableModel(user_id=user.id, agent_id=agent.id),
+            [(Tables.ROOMS__user_id.value, user.id), (Tables.ROOMS__agent_id.value, agent.id)],
+        )
+        return user, agent, room
+
+    async def aclose(self) -> None:
+        """Releases pooled connections, if any."""
+
+
+class ThreadedDatabase(AsyncDatabase):
+    """Runs a blocking Database in worker threads, for backends without an async client."""
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+    async def insert(self, table_name: str, item: TableModel) -> TableModel:
+        return await asyncio.to_thread(self.database.insert, table_name, item)
+
+    async def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        return await asyncio.to_thread(self.database.update, table_name, item, *conditions)
+
+    async def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        return await asyncio.to_thread(
+            self.database.get_row, table_name, *conditions, columns=columns, trusted=trusted
+        )
+
+    async def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        return await asyncio.to_thread(
+            self.database.get_multiple_rows,
+            table_name,
+            *conditions,
+            max_rows=max_rows,
+            from_time=from_time,
+            order_by=order_by,
+            order_desc=order_desc,
+            columns=columns,
+            trusted=trusted,
+        )
+
+    async def delete(self, table_name: str, *conditions) -> bool:
+        return await asyncio.to_thread(self.database.delete, table_name, *conditions)
+
+    async def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        return await asyncio.to_thread(self.database.query, table_name, *conditions, limit=limit)
+
+    async def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        return await asyncio.to_thread(
+            self.database.get_page,
+            table_name,
+            *conditions,
+            after=after,
+            page_size=page_size,
+            order_desc=order_desc,
+        )
+
+    async def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        return await asyncio.to_thread(self.database.bulk_insert, table_name, items)
+
+    async def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        return await asyncio.to_thread(self.database.resolve_identity, user, agent)
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.database.close)
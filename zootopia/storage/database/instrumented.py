@@ -0,0 +1,190 @@
+"""Metrics and slow-query log around every AsyncDatabase call"""
+
+import time
+from datetime import datetime
+from typing import Any, Awaitable, List, Optional, Sequence
+
+import orjson
+
+from config.config import InstrumentationConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.core.schema import AgentTableModel, TableModel, UserTableModel
+from zootopia.storage.database.database import AsyncDatabase, Identity
+
+IDENTITY = "identity"
+
+
+def _rows(result: Any) -> List[Any]:
+    """The rows a call returned, whatever its return type."""
+    if result is None or isinstance(result, bool):
+        return []
+    if isinstance(result, (list, tuple)):
+        return list(result)
+    return [result]
+
+
+def _payload_bytes(rows: List[Any]) -> int:
+    """Approximate wire size of rows, as JSON."""
+    return len(orjson.dumps([row.__dict__ for row in rows], default=str))
+
+
+class InstrumentedDatabase(AsyncDatabase):
+    """
+    Times and counts every call of the wrapped database, tagged by table and
+    operation, with the rows sent or returned:
+
+    - `db.query` timing, `db.queries` counter (result=ok|error)
+    - `db.rows` counter
+    - above `slow_query_ms`: `db.slow_queries` and `db.slow_query_bytes` (the
+      rows' approximate JSON size) counters, and a warning log
+
+    Rows are only serialized to measure their size for slow calls, so fast
+    calls pay nothing but the timing.
+    """
+
+    def __init__(self, database: AsyncDatabase, slow_query_ms: float = 250) -> None:
+        self.database = database
+        self._slow_query_seconds = slow_query_ms / 1000
+
+    @classmethod
+    def from_config(
+        cls, database: AsyncDatabase, config: InstrumentationConfig
+    ) -> "InstrumentedDatabase":
+        """Instantiate and return an InstrumentedDatabase object."""
+        return cls(database, slow_query_ms=config.SLOW_QUERY_MS)
+
+    async def _call(
+        self,
+        operation: str,
+        table_name: str,
+        call: Awaitable,
+        sent: Optional[List[TableModel]] = None,
+        conditions=(),
+    ) -> Any:
+        tags = {"table": table_name, "op": operation}
+        start = time.perf_counter()
+        try:
+            result = await call
+        except Exception:
+            metrics.incr("db.queries", result="error", **tags)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("db.query", elapsed, **tags)
+
+        rows = sent if sent is not None else _rows(result)
+        metrics.incr("db.queries", result="ok", **tags)
+        metrics.incr("db.rows", len(rows), **tags)
+        if elapsed >= self._slow_query_seconds:
+            size = _payload_bytes(rows) if rows else 0
+            metrics.incr("db.slow_queries", **tags)
+            metrics.incr("db.slow_query_bytes", size, **tags)
+            logger.warning(
+                f"Slow DB {operation} on {table_name}: {elapsed * 1000:.0f} ms, "
+                f"{len(rows)} rows, {size} bytes, conditions {list(conditions)}"
+            )
+        return result
+
+    async def insert(self, table_name: str, item: TableModel) -> TableModel:
+        return await self._call(
+            "insert", table_name, self.database.insert(table_name, item), sent=[item]
+        )
+
+    async def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        return await self._call(
+            "bulk_insert", table_name, self.database.bulk_insert(table_name, items), sent=items
+        )
+
+    async def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        return await self._call(
+            "update",
+            table_name,
+            self.database.update(table_name, item, *conditions),
+            sent=[item],
+            conditions=conditions,
+        )
+
+    async def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        return await self._call(
+            "get_row",
+            table_name,
+            self.database.get_row(table_name, *conditions, columns=columns, trusted=trusted),
+            conditions=conditions,
+        )
+
+    async def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        return await self._call(
+            "get_multiple_rows",
+            table_name,
+            self.database.get_multiple_rows(
+                table_name,
+                *conditions,
+                max_rows=max_rows,
+                from_time=from_time,
+                order_by=order_by,
+                order_desc=order_desc,
+                columns=columns,
+                trusted=trusted,
+            ),
+            conditions=conditions,
+        )
+
+    async def delete(self, table_name: str, *conditions) -> bool:
+        return await self._call(
+            "delete",
+            table_name,
+            self.database.delete(table_name, *conditions),
+            conditions=conditions,
+        )
+
+    async def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        return await self._call(
+            "query",
+            table_name,
+            self.database.query(table_name, *conditions, limit=limit),
+            conditions=conditions,
+        )
+
+    async def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        return await self._call(
+            "get_page",
+            table_name,
+            self.database.get_page(
+                table_name, *conditions, after=after, page_size=page_size, order_desc=order_desc
+            ),
+            conditions=conditions,
+        )
+
+    async def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        return await self._call(
+            "resolve_identity", IDENTITY, self.database.resolve_identity(user, agent)
+        )
+
+    async def aclose(self) -> None:
+        await self.database.aclose()
@@ -0,0 +1,129 @@
+"""In-process Database backend for tests and benchmarks"""
+
+import itertools
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from zootopia.storage.database.database import Database, decode_rows, keyset_columns
+from zootopia.core.schema import TableModel
+
+
+class InMemoryDB(Database):
+    """Keeps rows as dicts in memory. Nothing is persisted or shared between processes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tables: Dict[str, List[dict]] = defaultdict(list)
+        self._ids = itertools.count(1)
+
+    def _select(self, table_name: str, conditions) -> List[TableModel]:
+        return decode_rows(table_name, self._select_rows(table_name, conditions))
+
+    def _select_rows(self, table_name: str, conditions) -> List[dict]:
+        with self._lock:
+            return [
+                dict(row)
+                for row in self._tables[table_name]
+                if all(row.get(key) == value for key, value in conditions)
+            ]
+
+    @staticmethod
+    def _project(rows: List[dict], columns: Optional[Sequence[str]]) -> List[dict]:
+        if columns is None:
+            return rows
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def insert(self, table_name: str, item: TableModel) -> TableModel:
+        row = item.model_dump(exclude={"id"})
+        with self._lock:
+            row["id"] = next(self._ids)
+            self._tables[table_name].append(row)
+        return type(item)(**row)
+
+    def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        rows = [item.model_dump(exclude={"id"}) for item in items]
+        with self._lock:
+            for row in rows:
+                row["id"] = next(self._ids)
+            self._tables[table_name].extend(rows)
+        return [type(item)(**row) for item, row in zip(items, rows)]
+
+    def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        values = item.model_dump(exclude={"id"})
+        updated = None
+        with self._lock:
+            for row in self._tables[table_name]:
+                if all(row.get(key) == value for key, value in conditions):
+                    row.update(values)
+                    updated = updated or dict(row)
+        return type(item)(**updated) if updated else None
+
+    def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        rows = self._project(self._select_rows(table_name, conditions)[:1], columns)
+        return decode_rows(table_name, rows, trusted)[0] if rows else None
+
+    def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        rows = self._select(table_name, conditions)
+        if from_time is not None:
+            rows = [row for row in rows if row.created_at >= from_time]
+        rows.sort(key=lambda row: getattr(row, order_by), reverse=order_desc)
+        rows = rows[:max_rows]
+        if columns is None and not trusted:
+            return rows
+        return decode_rows(
+            table_name, self._project([row.model_dump() for row in rows], columns), trusted
+        )
+
+    def delete(self, table_name: str, *conditions) -> bool:
+        with self._lock:
+            rows = self._tables[table_name]
+            kept = [
+                row
+                for row in rows
+                if not all(row.get(key) == value for key, value in conditions)
+            ]
+            self._tables[table_name] = kept
+        return len(kept) < len(rows)
+
+    def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        return self._select(table_name, conditions)[:limit]
+
+    def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        columns = keyset_columns(table_name)
+
+        def key(row: TableModel) -> tuple:
+            return tuple(getattr(row, column) for column in columns)
+
+        rows = sorted(self._select(table_name, conditions), key=key, reverse=order_desc)
+        if after is not None:
+            rows = [
+                row for row in rows if (key(row) < key(after) if order_desc else key(row) > key(after))
+            ]
+        return rows[:page_size]
@@ -0,0 +1,65 @@
+-- Get-or-create of a message's user, agent and room in one round trip.
+-- Called by SupabaseDB / AsyncSupabaseDB.resolve_identity through PostgREST RPC.
+--
+-- The unique indexes make concurrent first messages of a sender converge on
+-- one user and one room instead of creating duplicates.
+-- Existing duplicate rows must be merged before they can be created.
+
+create unique index if not exists users_telegram_uid_key
+    on users (telegram_uid) where telegram_uid is not null;
+create unique index if not exists users_phone_number_key
+    on users (phone_number) where phone_number is not null;
+create unique index if not exists agents_bird_channel_id_key
+    on agents (bird_channel_id) where bird_channel_id is not null;
+create unique index if not exists rooms_user_id_agent_id_key
+    on rooms (user_id, agent_id);
+
+create or replace function resolve_identity(
+    p_telegram_uid text,
+    p_phone_number text,
+    p_telegram_chat_id text,
+    p_bird_channel_id text
+) returns json
+language plpgsql
+as $$
+declare
+    v_user users;
+    v_agent agents;
+    v_room rooms;
+begin
+    -- "on conflict do nothing" waits for a concurrent insert of the same key,
+    -- so the select after it always finds the one row
+    if p_telegram_uid is not null then
+        insert into users (telegram_uid) values (p_telegram_uid)
+            on conflict (telegram_uid) where telegram_uid is not null do nothing;
+        select * into v_user from users where telegram_uid = p_telegram_uid;
+    else
+        insert into users (phone_number) values (p_phone_number)
+            on conflict (phone_number) where phone_number is not null do nothing;
+        select * into v_user from users where phone_number = p_phone_number;
+    end if;
+
+    if p_bird_channel_id is not null then
+        insert into agents (bird_channel_id) values (p_bird_channel_id)
+            on conflict (bird_channel_id) where bird_channel_id is not null do nothing;
+        select * into v_agent from agents where bird_channel_id = p_bird_channel_id;
+    else
+        -- Telegram messages all go to the one bot agent, i.e. the first agent row
+        select * into v_agent from agents order by id limit 1;
+        if not found then
+            insert into agents (telegram_chat_id) values (p_telegram_chat_id)
+                returning * into v_agent;
+        end if;
+    end if;
+
+    insert into rooms (user_id, agent_id) values (v_user.id, v_agent.id)
+        on conflict (user_id, agent_id) do nothing;
+    select * into v_room from rooms where user_id = v_user.id and agent_id = v_agent.id;
+
+    return json_build_object(
+        'user', row_to_json(v_user),
+        'agent', row_to_json(v_agent),
+        'room', row_to_json(v_room)
+    );
+end;
+$$;
@@ -0,0 +1,141 @@
+"""Per-room ring buffer of recent messages in Redis, in front of the history query"""
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import orjson
+
+from config.config import RecentMessagesConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.core.schema import MessageTableModel, Tables
+
+# What ShortTermHistory uses of a message
+_FIELDS = (
+    Tables.MESSAGES__created_at.value,
+    Tables.MESSAGES__from_user.value,
+    Tables.MESSAGES__message.value,
+)
+
+
+def _created_at(entry: dict) -> datetime:
+    created_at = entry[Tables.MESSAGES__created_at.value]
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+
+
+def _entry_key(entry: dict) -> tuple:
+    """Identifies a message whether it was pushed or read from the database."""
+    return (
+        _created_at(entry),
+        entry[Tables.MESSAGES__from_user.value],
+        entry[Tables.MESSAGES__message.value],
+    )
+
+
+class RecentMessages:
+    """
+    Keeps the last `max_size` messages of each room in a Redis list, newest first.
+
+    Every saved message is pushed to its room's list (`push`, LPUSH + LTRIM), by
+    whichever worker saved it. The list is only served once it has been seeded
+    from the database (`seed`), which merges the rows read with what was pushed
+    meanwhile and marks the list complete. Seeding is a WATCH/MULTI transaction
+    that gives up if another worker completed the list first, so concurrent seeds
+    never drop a push. Redis errors are logged and read as a miss.
+    """
+
+    KEY_PREFIX = "recent"
+
+    def __init__(self, redis_url: str, max_size: int = 50, ttl_seconds: int = 86400) -> None:
+        from redis import asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+        self.max_size = max_size
+        self._ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_config(cls, config: RecentMessagesConfig, redis_url: str) -> "RecentMessages":
+        """Instantiate and return a RecentMessages object."""
+        return cls(redis_url, max_size=config.MAX_SIZE, ttl_seconds=config.TTL_SECONDS)
+
+    def _key(self, room_id) -> str:
+        return f"{self.KEY_PREFIX}:{room_id}"
+
+    def _complete_key(self, room_id) -> str:
+        return f"{self.KEY_PREFIX}:{room_id}:complete"
+
+    async def get(self, room_id, count: int) -> Optional[List[MessageTableModel]]:
+        """
+        The last `count` (at most `max_size`) messages of a room, oldest first, or
+        None on a miss. A complete list with no messages yet is a hit: [].
+        """
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.exists(self._complete_key(room_id))
+            pipeline.lrange(self._key(room_id), 0, min(count, self.max_size) - 1)
+            complete, values = await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error reading recent messages from Redis: {e}")
+            complete, values = False, []
+        metrics.incr("history.recent", result="hit" if complete else "miss")
+        if not complete:
+            return None
+        return [
+            MessageTableModel.model_construct(room_id=room_id, **orjson.loads(value))
+            for value in reversed(values)
+        ]
+
+    async def push(self, message: MessageTableModel) -> None:
+        """Adds a just-saved message to its room's list."""
+        key = self._key(message.room_id)
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.lpush(key, self._encode(message))
+            pipeline.ltrim(key, 0, self.max_size - 1)
+            pipeline.expire(key, self._ttl_seconds)
+            pipeline.expire(self._complete_key(message.room_id), self._ttl_seconds)
+            await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error pushing a recent message to Redis: {e}")
+
+    async def seed(self, room_id, messages: List[MessageTableModel]) -> None:
+        """
+        Completes a room's list with `messages` (oldest first), as read from the
+        database, unless another worker already did.
+        """
+        key = self._key(room_id)
+        complete_key = self._complete_key(room_id)
+        rows = [orjson.loads(self._encode(message)) for message in messages]
+
+        async def complete(pipeline) -> None:
+            if await pipeline.exists(complete_key):
+                return
+            pushed = [orjson.loads(value) for value in await pipeline.lrange(key, 0, -1)]
+            entries = {_entry_key(entry): entry for entry in rows + pushed}
+            newest_first = sorted(entries.items(), key=lambda item: item[0][0], reverse=True)
+
+            pipeline.multi()
+            pipeline.delete(key)
+            if newest_first:
+                pipeline.rpush(
+                    key,
+                    *[orjson.dumps(entry) for _, entry in newest_first[: self.max_size]],
+                )
+                pipeline.expire(key, self._ttl_seconds)
+            pipeline.set(complete_key, 1, ex=self._ttl_seconds)
+
+        try:
+            # Retried from the start if a push or another seed touched the list meanwhile
+            await self._redis.transaction(complete, key, complete_key)
+        except Exception as e:
+            logger.error(f"Error seeding recent messages in Redis: {e}")
+
+    async def aclose(self) -> None:
+        """Closes the Redis connection."""
+        await self._redis.aclose()
+
+    @staticmethod
+    def _encode(message: MessageTableModel) -> bytes:
+        return orjson.dumps({field: getattr(message, field) for field in _FIELDS})
@@ -0,0 +1,268 @@
+"""Embedded SQLite Database backend for single-node deployments and benchmarks"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from config.config import SQLiteConfig
+from zootopia.core.schema import (
+    AgentTableModel,
+    RoomTableModel,
+    TableModel,
+    Tables,
+    UserTableModel,
+)
+from zootopia.core.schema.table import TABLE_MODEL_MAP
+from zootopia.storage.database.database import (
+    Database,
+    Identity,
+    decode_rows,
+    identity_conditions,
+    keyset_columns,
+)
+
+SCHEMA = """
+create table if not exists users (
+    id integer primary key autoincrement,
+    created_at text,
+    phone_number text,
+    telegram_uid text
+);
+create table if not exists agents (
+    id integer primary key autoincrement,
+    first_message text,
+    telegram_chat_id text,
+    bird_channel_id text
+);
+create table if not exists rooms (
+    id integer primary key autoincrement,
+    created_at text,
+    user_id integer references users (id),
+    agent_id integer references agents (id)
+);
+create table if not exists messages (
+    id integer primary key autoincrement,
+    room_id integer references rooms (id),
+    created_at text,
+    from_user integer,
+    message text
+);
+create index if not exists users_telegram_uid_idx on users (telegram_uid);
+create index if not exists users_phone_number_idx on users (phone_number);
+create index if not exists agents_bird_channel_id_idx on agents (bird_channel_id);
+create index if not exists rooms_user_id_agent_id_idx on rooms (user_id, agent_id);
+create index if not exists messages_room_id_created_at_idx on messages (room_id, created_at);
+"""
+
+
+def _to_db(value):
+    """Stores datetimes in the `utc_now` format, so text order is time order."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    return value
+
+
+class SQLiteDB(Database):
+    """
+    Keeps the tables of TABLE_MODEL_MAP in a local SQLite file, in WAL mode so
+    reads don't block on writes. One connection is shared behind a lock;
+    wrap it in ThreadedDatabase to use it from async code.
+    """
+
+    def __init__(self, path: str = "zootopia.db") -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("pragma journal_mode = wal")
+        self._connection.execute("pragma synchronous = normal")
+        self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: SQLiteConfig) -> "SQLiteDB":
+        """Instantiate and return a SQLiteDB object."""
+        return cls(path=config.PATH)
+
+    @staticmethod
+    def _columns(table_name: str, columns) -> List[str]:
+        # Column names can't be bound as parameters, so only accept model fields
+        fields = TABLE_MODEL_MAP[table_name].model_fields
+        for column in columns:
+            if column not in fields:
+                raise ValueError(f"Unknown column {column!r} of table {table_name!r}")
+        return list(columns)
+
+    def _where(self, table_name: str, conditions):
+        if not conditions:
+            return "", []
+        columns = self._columns(table_name, [key for key, _ in conditions])
+        clause = " and ".join(f"{column} = ?" for column in columns)
+        return f" where {clause}", [_to_db(value) for _, value in conditions]
+
+    def _projection(self, table_name: str, columns: Optional[Sequence[str]]) -> str:
+        return ", ".join(self._columns(table_name, columns)) if columns else "*"
+
+    def _select(self, table_name: str, sql: str, params, trusted: bool = False) -> List[TableModel]:
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return decode_rows(table_name, (dict(row) for row in rows), trusted)
+
+    def _insert_rows(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        # Callers hold the lock
+        inserted = []
+        for item in items:
+            row = {key: _to_db(value) for key, value in item.model_dump(exclude={"id"}).items()}
+            columns = self._columns(table_name, row)
+            cursor = self._connection.execute(
+                f"insert into {table_name} ({', '.join(columns)}) "
+                f"values ({', '.join('?' for _ in columns)})",
+                list(row.values()),
+            )
+            inserted.append(type(item)(id=cursor.lastrowid, **row))
+        return inserted
+
+    def insert(self, table_name: str, item: TableModel) -> TableModel:
+        with self._lock:
+            return self._insert_rows(table_name, [item])[0]
+
+    def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        with self._lock:
+            self._connection.execute("begin")
+            try:
+                inserted = self._insert_rows(table_name, items)
+            except Exception:
+                self._connection.execute("rollback")
+                raise
+            self._connection.execute("commit")
+        return inserted
+
+    def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        values = {key: _to_db(value) for key, value in item.model_dump(exclude={"id"}).items()}
+        columns = self._columns(table_name, values)
+        where, params = self._where(table_name, conditions)
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock:
+            self._connection.execute(
+                f"update {table_name} set {assignments}{where}",
+                list(values.values()) + params,
+            )
+        return self.get_row(table_name, *conditions)
+
+    def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        where, params = self._where(table_name, conditions)
+        projection = self._projection(table_name, columns)
+        rows = self._select(
+            table_name, f"select {projection} from {table_name}{where} limit 1", params, trusted
+        )
+        return rows[0] if rows else None
+
+    def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        where, params = self._where(table_name, conditions)
+        if from_time is not None:
+            where += " and created_at >= ?" if where else " where created_at >= ?"
+            params.append(_to_db(from_time))
+        (order_by,) = self._columns(table_name, [order_by])
+        direction = "desc" if order_desc else "asc"
+        projection = self._projection(table_name, columns)
+        return self._select(
+            table_name,
+            f"select {projection} from {table_name}{where} "
+            f"order by {order_by} {direction}, id {direction} limit ?",
+            params + [max_rows],
+            trusted,
+        )
+
+    def delete(self, table_name: str, *conditions) -> bool:
+        where, params = self._where(table_name, conditions)
+        with self._lock:
+            cursor = self._connection.execute(f"delete from {table_name}{where}", params)
+        return cursor.rowcount > 0
+
+    def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        where, params = self._where(table_name, conditions)
+        if limit is None:
+            return self._select(table_name, f"select * from {table_name}{where}", params)
+        return self._select(
+            table_name, f"select * from {table_name}{where} limit ?", params + [limit]
+        )
+
+    def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        where, params = self._where(table_name, conditions)
+        columns = keyset_columns(table_name)
+        direction = "desc" if order_desc else "asc"
+        if after is not None:
+            # Row values compare lexicographically, i.e. (created_at, id) > (?, ?)
+            operator = "<" if order_desc else ">"
+            keyset = (
+                f"({', '.join(columns)}) {operator} ({', '.join('?' for _ in columns)})"
+            )
+            where += f" and {keyset}" if where else f" where {keyset}"
+            params += [_to_db(getattr(after, column)) for column in columns]
+        order = ", ".join(f"{column} {direction}" for column in columns)
+        return self._select(
+            table_name,
+            f"select * from {table_name}{where} order by {order} limit ?",
+            params + [page_size],
+        )
+
+    def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        """Gets or creates user, agent & room in one transaction, so concurrent calls agree."""
+        user_conditions, agent_conditions = identity_conditions(user, agent)
+
+        def get_or_create(table_name: str, item: TableModel, conditions) -> TableModel:
+            where, params = self._where(table_name, conditions)
+            row = self._connection.execute(
+                f"select * from {table_name}{where} order by id limit 1", params
+            ).fetchone()
+            if row is not None:
+                return TABLE_MODEL_MAP[table_name](**dict(row))
+            return self._insert_rows(table_name, [item])[0]
+
+        with self._lock:
+            self._connection.execute("begin immediate")
+            try:
+                user = get_or_create(Tables.USERS.value, user, user_conditions)
+                agent = get_or_create(Tables.AGENTS.value, agent, agent_conditions)
+                room = get_or_create(
+                    Tables.ROOMS.value,
+                    RoomTableModel(user_id=user.id, agent_id=agent.id),
+                    [
+                        (Tables.ROOMS__user_id.value, user.id),
+                        (Tables.ROOMS__agent_id.value, agent.id),
+                    ],
+                )
+            except Exception:
+                self._connection.execute("rollback")
+                raise
+            self._connection.execute("commit")
+        return user, agent, room
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -1,18 +1,91 @@
 
+import importlib.util
 from datetime import datetime
-from typing import List, Optional, TypeVar
-from supabase import create_client
-from zootopia.storage.database.database import Database
+from typing import List, Optional, Sequence, TypeVar
+
+import httpx
+
+from zootopia.core.logger import logger
+from zootopia.storage.database.database import (
+    AsyncDatabase,
+    Database,
+    Identity,
+    decode_rows,
+    keyset_columns,
+)
+from config.config import SupabaseConfig as SupabasePoolConfig
 from config.models import SupabaseConfig
-from zootopia.core.schema import TableModel
+from zootopia.core.schema import AgentTableModel, RoomTableModel, TableModel, UserTableModel
 from zootopia.core.schema.table import TABLE_MODEL_MAP
 
 T = TypeVar("T", bound=TableModel)
 
+# Defined by migrations/001_resolve_identity.sql
+RESOLVE_IDENTITY_RPC = "resolve_identity"
+RPC_NOT_FOUND = "PGRST202"
+
+
+def _identity_params(user: UserTableModel, agent: AgentTableModel) -> dict:
+    return {
+        "p_telegram_uid": user.telegram_uid,
+        "p_phone_number": user.phone_number,
+        "p_telegram_chat_id": agent.telegram_chat_id,
+        "p_bird_channel_id": agent.bird_channel_id,
+    }
+
+
+def _parse_identity(data: dict) -> Identity:
+    return (
+        UserTableModel(**data["user"]),
+        AgentTableModel(**data["agent"]),
+        RoomTableModel(**data["room"]),
+    )
+
+
+def _projection(columns: Optional[Sequence[str]]) -> str:
+    """PostgREST select list: only `columns` if given, so fewer bytes come back."""
+    return ",".join(columns) if columns else "*"
+
+
+def _keyset_page(
+    query, table_name: str, after: Optional[TableModel], page_size: int, order_desc: bool
+):
+    """Filters a select to the `page_size` rows after `after`, in keyset_columns order."""
+    columns = keyset_columns(table_name)
+    if after is not None:
+        operator = "lt" if order_desc else "gt"
+        values = []
+        for column in columns:
+            value = getattr(after, column)
+            value = value.isoformat() if isinstance(value, datetime) else value
+            # Quoted, since timestamps contain PostgREST's reserved ':' and '.'
+            values.append(f'"{value}"')
+        if len(columns) == 1:
+            query = query.filter(columns[0], operator, values[0])
+        else:
+            (first, second), (first_value, second_value) = columns, values
+            query = query.or_(
+                f"{first}.{operator}.{first_value},"
+                f"and({first}.eq.{first_value},{second}.{operator}.{second_value})"
+            )
+    for column in columns:
+        query = query.order(column, desc=order_desc)
+    return query.limit(page_size)
+
+
+def _warn_missing_identity_rpc() -> None:
+    logger.warning(
+        f"Function {RESOLVE_IDENTITY_RPC} not found, run "
+        "migrations/001_resolve_identity.sql. Falling back to separate queries."
+    )
+
 
 class SupabaseDB(Database):
     def __init__(self, url: str, key: str) -> None:
+        from supabase import create_client
+
         self.supabase = create_client(url, key)
+        self._has_identity_rpc = True
 
     @classmethod
     def from_config(cls, config: SupabaseConfig):
@@ -24,6 +97,14 @@ class SupabaseDB(Database):
         data, _ = self.supabase.table(table_name).insert(item_dict).execute()
         return type(item)(**data[1][0]) if data and data[1] else None
 
+    def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        if not items:
+            return []
+        rows = [item.model_dump(exclude={"id"}) for item in items]
+        data, _ = self.supabase.table(table_name).insert(rows).execute()
+        model_class = TABLE_MODEL_MAP[table_name]
+        return [model_class(**item) for item in data[1]] if data and data[1] else []
+
     def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
         query = self.supabase.table(table_name).update(item.model_dump())
         for key, value in conditions:
@@ -31,28 +112,35 @@ class SupabaseDB(Database):
         data, _ = query.execute()
         return type(item)(**data[1][0]) if data and data[1] else None
 
-    def get_row(self, table_name: str, *conditions) -> Optional[TableModel]:
-        query = self.supabase.table(table_name).select("*")
+    def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        query = self.supabase.table(table_name).select(_projection(columns))
         for key, value in conditions:
             query = query.eq(key, value)
 
         data, _ = query.limit(1).execute()
 
         if data and data[1]:
-            model_class = TABLE_MODEL_MAP[table_name]
-            return model_class(**data[1][0])
+            return decode_rows(table_name, data[1][:1], trusted)[0]
         return None
 
     def get_multiple_rows(
         self,
         table_name: str,
+        *conditions,
         max_rows: int = 10,
         from_time: Optional[datetime] = None,
         order_by: str = "created_at",
         order_desc: bool = True,
-        *conditions
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
     ) -> List[TableModel]:
-        query = self.supabase.table(table_name).select("*")
+        query = self.supabase.table(table_name).select(_projection(columns))
 
         for key, value in conditions:
             query = query.eq(key, value)
@@ -64,8 +152,7 @@ class SupabaseDB(Database):
 
         data, _ = query.execute()
 
-        model_class = TABLE_MODEL_MAP[table_name]
-        return [model_class(**item) for item in data[1]] if data and data[1] else []
+        return decode_rows(table_name, data[1], trusted) if data and data[1] else []
 
     def delete(self, table_name: str, *conditions) -> bool:
         query = self.supabase.table(table_name).delete()
@@ -74,10 +161,206 @@ class SupabaseDB(Database):
         data, _ = query.execute()
         return bool(data and data[1])
 
-    def query(self, table_name: str, *conditions) -> List[TableModel]:
+    def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
         query = self.supabase.table(table_name).select("*")
         for key, value in conditions:
             query = query.eq(key, value)
+        if limit is not None:
+            query = query.limit(limit)
         data, _ = query.execute()
         model_class = TABLE_MODEL_MAP[table_name]
         return [model_class(**item) for item in data[1]] if data and data[1] else []
+
+    def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        query = self.supabase.table(table_name).select("*")
+        for key, value in conditions:
+            query = query.eq(key, value)
+        data, _ = _keyset_page(query, table_name, after, page_size, order_desc).execute()
+        model_class = TABLE_MODEL_MAP[table_name]
+        return [model_class(**item) for item in data[1]] if data and data[1] else []
+
+    def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        """Gets or creates user, agent & room in one round trip (one RPC)."""
+        from postgrest.exceptions import APIError
+
+        if self._has_identity_rpc:
+            try:
+                rpc = self.supabase.rpc(RESOLVE_IDENTITY_RPC, _identity_params(user, agent))
+                return _parse_identity(rpc.execute().data)
+            except APIError as e:
+                if e.code != RPC_NOT_FOUND:
+                    raise
+                _warn_missing_identity_rpc()
+                self._has_identity_rpc = False
+        return super().resolve_identity(user, agent)
+
+
+class AsyncSupabaseDB(AsyncDatabase):
+    """
+    Talks to Supabase's PostgREST API with one pooled, keep-alive httpx client
+    (HTTP/2 when `h2` is installed), shared by every request of the worker.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        http2: bool = True,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+    ) -> None:
+        from postgrest import AsyncPostgrestClient
+        from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 needs the h2 package, falling back to HTTP/1.1.")
+            http2 = False
+
+        self.postgrest = AsyncPostgrestClient(
+            f"{url}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apiKey": key,
+                "Authorization": f"Bearer {key}",
+            },
+        )
+        # Swap in a session with our pool limits, timeouts and HTTP/2
+        # (the default one hasn't opened any connection yet)
+        default_session = self.postgrest.session
+        self.postgrest.session = httpx.AsyncClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            http2=http2,
+            limits=limits or httpx.Limits(),
+            timeout=timeout or httpx.Timeout(10),
+            follow_redirects=True,
+        )
+        self._has_identity_rpc = True
+
+    @classmethod
+    def from_config(cls, config: SupabasePoolConfig) -> "AsyncSupabaseDB":
+        """Instantiate and return an AsyncSupabaseDB object."""
+        return cls(
+            url=config.URL,
+            key=config.KEY,
+            http2=config.HTTP2,
+            limits=httpx.Limits(
+                max_connections=config.MAX_CONNECTIONS,
+                max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                config.TIMEOUT_SECONDS, connect=config.CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+
+    def _filter(self, query, conditions):
+        for key, value in conditions:
+            query = query.eq(key, value)
+        return query
+
+    async def insert(self, table_name: str, item: TableModel) -> TableModel:
+        # Remove 'id' field, since Supabase auto-increments
+        item_dict = item.model_dump(mode="json", exclude={"id"})
+        response = await self.postgrest.table(table_name).insert(item_dict).execute()
+        return type(item)(**response.data[0]) if response.data else None
+
+    async def bulk_insert(self, table_name: str, items: List[TableModel]) -> List[TableModel]:
+        if not items:
+            return []
+        rows = [item.model_dump(mode="json", exclude={"id"}) for item in items]
+        response = await self.postgrest.table(table_name).insert(rows).execute()
+        model_class = TABLE_MODEL_MAP[table_name]
+        return [model_class(**item) for item in response.data]
+
+    async def update(self, table_name: str, item: TableModel, *conditions) -> TableModel:
+        query = self.postgrest.table(table_name).update(item.model_dump(mode="json"))
+        response = await self._filter(query, conditions).execute()
+        return type(item)(**response.data[0]) if response.data else None
+
+    async def get_row(
+        self,
+        table_name: str,
+        *conditions,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> Optional[TableModel]:
+        query = self.postgrest.table(table_name).select(_projection(columns))
+        response = await self._filter(query, conditions).limit(1).execute()
+        if response.data:
+            return decode_rows(table_name, response.data[:1], trusted)[0]
+        return None
+
+    async def get_multiple_rows(
+        self,
+        table_name: str,
+        *conditions,
+        max_rows: int = 10,
+        from_time: Optional[datetime] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        columns: Optional[Sequence[str]] = None,
+        trusted: bool = False,
+    ) -> List[TableModel]:
+        query = self.postgrest.table(table_name).select(_projection(columns))
+        query = self._filter(query, conditions)
+        if from_time is not None:
+            query = query.gte("created_at", from_time.isoformat())
+        response = await query.order(order_by, desc=order_desc).limit(max_rows).execute()
+        return decode_rows(table_name, response.data, trusted)
+
+    async def delete(self, table_name: str, *conditions) -> bool:
+        query = self._filter(self.postgrest.table(table_name).delete(), conditions)
+        response = await query.execute()
+        return bool(response.data)
+
+    async def query(
+        self, table_name: str, *conditions, limit: Optional[int] = None
+    ) -> List[TableModel]:
+        query = self._filter(self.postgrest.table(table_name).select("*"), conditions)
+        if limit is not None:
+            query = query.limit(limit)
+        response = await query.execute()
+        model_class = TABLE_MODEL_MAP[table_name]
+        return [model_class(**item) for item in response.data]
+
+    async def get_page(
+        self,
+        table_name: str,
+        *conditions,
+        after: Optional[TableModel] = None,
+        page_size: int = 500,
+        order_desc: bool = False,
+    ) -> List[TableModel]:
+        query = self._filter(self.postgrest.table(table_name).select("*"), conditions)
+        response = await _keyset_page(query, table_name, after, page_size, order_desc).execute()
+        model_class = TABLE_MODEL_MAP[table_name]
+        return [model_class(**item) for item in response.data]
+
+    async def resolve_identity(self, user: UserTableModel, agent: AgentTableModel) -> Identity:
+        """Gets or creates user, agent & room in one round trip (one RPC)."""
+        from postgrest.exceptions import APIError
+
+        if self._has_identity_rpc:
+            try:
+                rpc = self.postgrest.rpc(RESOLVE_IDENTITY_RPC, _identity_params(user, agent))
+                return _parse_identity((await rpc.execute()).data)
+            except APIError as e:
+                if e.code != RPC_NOT_FOUND:
+                    raise
+                _warn_missing_identity_rpc()
+                self._has_identity_rpc = False
+        return await super().resolve_identity(user, agent)
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        await self.postgrest.aclose()
@@ -0,0 +1,111 @@
+"""Write-behind buffer that persists message rows in batches"""
+
+import asyncio
+from typing import List, Optional
+
+from config.config import MessageWriterConfig
+from zootopia.core.logger import logger
+from zootopia.core.metrics import metrics
+from zootopia.core.schema import MessageTableModel, Tables
+from zootopia.storage.database.database import AsyncDatabase
+
+
+class MessageWriter:
+    """
+    Buffers message rows and writes them with one `bulk_insert` per batch, once
+    `max_batch` rows are waiting or every `flush_interval` seconds. Callers don't
+    wait on the database, and `pending` lets history include rows not yet written.
+
+    A failed batch is put back and retried on the next flush. `aclose` flushes what is
+    left on shutdown. Past `max_pending` rows (DB down) the oldest rows are dropped.
+    """
+
+    def __init__(
+        self,
+        database: AsyncDatabase,
+        max_batch: int = 200,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+    ) -> None:
+        self.database = database
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._buffer: List[MessageTableModel] = []
+        self._in_flight: List[MessageTableModel] = []
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, database: AsyncDatabase, config: MessageWriterConfig) -> "MessageWriter":
+        """Instantiate and return a MessageWriter object."""
+        return cls(
+            database,
+            max_batch=config.MAX_BATCH,
+            flush_interval=config.FLUSH_INTERVAL_SECONDS,
+            max_pending=config.MAX_PENDING,
+        )
+
+    def write(self, message: MessageTableModel) -> None:
+        """Queues a row without waiting for the database."""
+        self._buffer.append(message)
+        if len(self._buffer) > self._max_pending:
+            del self._buffer[0]
+            metrics.incr("db.writer.dropped")
+            logger.error(f"Message writer over {self._max_pending} rows, dropped the oldest.")
+        if len(self._buffer) >= self._max_batch:
+            self._wake.set()
+
+    def pending(self, room_id) -> List[MessageTableModel]:
+        """Rows of a room that are buffered or being written, oldest first."""
+        return [
+            message
+            for message in self._in_flight + self._buffer
+            if message.room_id == room_id
+        ]
+
+    async def start(self) -> None:
+        """Starts the background flush loop."""
+        if self._task is None:
+            metrics.register_gauge(
+                "db.writer.pending", lambda: len(self._buffer) + len(self._in_flight)
+            )
+            self._task = asyncio.create_task(self._run())
+
+    async def flush(self) -> None:
+        """Writes every buffered row, one batch at a time, stopping at the first failure."""
+        while self._buffer and not self._in_flight:
+            self._in_flight = self._buffer[: self._max_batch]
+            del self._buffer[: self._max_batch]
+            try:
+                with metrics.timer("db.writer.flush"):
+                    await self.database.bulk_insert(Tables.MESSAGES.value, self._in_flight)
+                metrics.incr("db.writer.rows", len(self._in_flight))
+            except Exception as e:
+                logger.error(f"Error writing {len(self._in_flight)} messages, will retry: {e}")
+                self._buffer[:0] = self._in_flight
+                return
+            finally:
+                self._in_flight = []
+
+    async def aclose(self) -> None:
+        """Stops the flush loop and writes what is left."""
+        # Let a flush in progress finish rather than cancelling it mid-request
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            logger.error(f"Message writer closed with {len(self._buffer)} unwritten rows.")
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()